@@ -5,70 +5,82 @@ Checks if all required files and dependencies are properly configured for Stream
 """
 
 import os
+import re
 import sys
 from pathlib import Path
 
-def check_file_exists(filepath, description):
-    """Check if a file exists and report status"""
-    if os.path.exists(filepath):
+def scan_entries(directories):
+    """Collect the paths present in each directory with a single scandir per directory.
+    
+    Returns all entry paths and, separately, the subset that are directories
+    (taken from the dirent type, so no follow-up stat is needed).
+    """
+    entries = set()
+    subdirs = set()
+    for directory in directories:
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    path = os.path.normpath(os.path.join(directory, entry.name))
+                    entries.add(path)
+                    if entry.is_dir():
+                        subdirs.add(path)
+        except FileNotFoundError:
+            continue
+    return entries, subdirs
+
+def check_file_exists(filepath, description, entries):
+    """Check if a file is present in the scanned entries and report status"""
+    if os.path.normpath(filepath) in entries:
         print(f"✅ {description}: {filepath}")
         return True
     else:
         print(f"❌ {description}: {filepath} - NOT FOUND")
         return False
 
-def check_requirements():
-    """Check requirements.txt content"""
-    if not os.path.exists('requirements.txt'):
-        print("❌ requirements.txt not found")
-        return False
-    
-    with open('requirements.txt', 'r') as f:
-        content = f.read()
-    
-    required_packages = [
-        'streamlit',
-        'opencv-python-headless',
-        'plotly',
-        'pandas',
-        'numpy',
-        'psutil'
-    ]
-    
-    missing = []
-    for package in required_packages:
-        if package not in content:
-            missing.append(package)
-    
-    if missing:
-        print(f"❌ Missing packages in requirements.txt: {', '.join(missing)}")
-        return False
-    else:
-        print("✅ All required packages found in requirements.txt")
-        return True
+def read_package_names(filepath):
+    """Read a package list into a set of names with version specifiers stripped"""
+    try:
+        content = Path(filepath).read_text()
+    except FileNotFoundError:
+        return None
+    
+    names = set()
+    for line in content.splitlines():
+        name = re.split(r'[<>=!~;\s]', line.strip(), maxsplit=1)[0]
+        if name and not name.startswith('#'):
+            names.add(name.lower())
+    return names
 
-def check_packages_txt():
-    """Check packages.txt for system dependencies"""
-    if not os.path.exists('packages.txt'):
-        print("❌ packages.txt not found")
-        return False
-    
-    with open('packages.txt', 'r') as f:
-        content = f.read()
-    
-    required_packages = ['ffmpeg', 'libsm6', 'libxext6']
+def check_dependency_files():
+    """Check requirements.txt and packages.txt in a single pass"""
+    checks = [
+        ('requirements.txt',
+         {'streamlit', 'opencv-python-headless', 'plotly', 'pandas', 'numpy', 'psutil'},
+         "Missing packages in requirements.txt",
+         "All required packages found in requirements.txt"),
+        ('packages.txt',
+         {'ffmpeg', 'libsm6', 'libxext6'},
+         "Missing system packages",
+         "All required system packages found in packages.txt")
+    ]
     
-    missing = []
-    for package in required_packages:
-        if package not in content:
-            missing.append(package)
+    all_good = True
+    for filepath, required, missing_message, ok_message in checks:
+        names = read_package_names(filepath)
+        if names is None:
+            print(f"❌ {filepath} not found")
+            all_good = False
+            continue
+        
+        missing = required - names
+        if missing:
+            print(f"❌ {missing_message}: {', '.join(sorted(missing))}")
+            all_good = False
+        else:
+            print(f"✅ {ok_message}")
     
-    if missing:
-        print(f"❌ Missing system packages: {', '.join(missing)}")
-        return False
-    else:
-        print("✅ All required system packages found in packages.txt")
-        return True
+    return all_good
 
 def main():
     """Main verification function"""
@@ -89,23 +101,22 @@ def main():
         ('README.md', 'Documentation')
     ]
     
+    # One directory listing per parent instead of a stat per file
+    entries, subdirs = scan_entries({'.'} | {os.path.dirname(f) or '.' for f, _ in files_to_check})
+    
     for filepath, description in files_to_check:
-        if not check_file_exists(filepath, description):
+        if not check_file_exists(filepath, description, entries):
             all_good = False
     
-    # Check requirements
-    if not check_requirements():
-        all_good = False
-    
-    # Check system packages
-    if not check_packages_txt():
+    # Check requirements and system packages
+    if not check_dependency_files():
         all_good = False
     
     # Check directory structure
     required_dirs = ['src', 'uploads', 'output', 'temp_processing']
-    for directory in required_dirs:
-        if not os.path.exists(directory):
-            print(f"⚠️  Directory will be created on first run: {directory}")
+    missing_dirs = [d for d in required_dirs if d not in subdirs]
+    for directory in missing_dirs:
+        print(f"⚠️  Directory will be created on first run: {directory}")
     
     print("\n" + "=" * 50)
     
@@ -11,14 +11,19 @@ Created: February 2026
 
 import streamlit as st
 import os
+import shutil
 import time
 import json
 from datetime import datetime
-from multiprocessing import Pool, freeze_support
+from pathlib import Path
+import multiprocessing as mp
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import freeze_support
 
 # Import local modules
-from src.video_processor import VideoProcessor
-from src.ai_optimizer import AIOptimizer
+from src.video_processor import VideoProcessor, init_worker, threads_per_worker, worker_init_args
+from src.ai_optimizer import get_optimizer
 from src.performance_monitor import PerformanceMonitor
 from src.ui_components import UIComponents
 
@@ -30,17 +35,119 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Chunk size for persisting uploads to disk
+UPLOAD_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Static markup for the real-time metric grid; only the numbers change per rerun
+_METRICS_TEMPLATE = """
+<div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; margin: 1rem 0;">
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
+        <h4>💻 CPU Usage</h4>
+        <h2>{cpu:.1f}%</h2>
+        <p>{cores} cores</p>
+    </div>
+    <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
+        <h4>🧠 Memory Usage</h4>
+        <h2>{mem:.1f}%</h2>
+        <p>{free:.1f} GB free</p>
+    </div>
+    <div style="background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
+        <h4>💾 Disk Usage</h4>
+        <h2>{disk:.1f}%</h2>
+        <p>{used:.0f} GB used</p>
+    </div>
+</div>
+"""
+
 # Initialize session state
 if 'performance_monitor' not in st.session_state:
     st.session_state.performance_monitor = PerformanceMonitor()
     st.session_state.performance_monitor.start_monitoring()
 
 if 'ai_optimizer' not in st.session_state:
-    st.session_state.ai_optimizer = AIOptimizer()
+    st.session_state.ai_optimizer = get_optimizer()
 
 if 'video_processor' not in st.session_state:
     st.session_state.video_processor = VideoProcessor()
 
+# Working directories are created once per session, not per rerun or segment
+if 'dirs_ready' not in st.session_state:
+    os.makedirs("output", exist_ok=True)
+    os.makedirs("uploads", exist_ok=True)
+    st.session_state.dirs_ready = True
+
+
+# Workers start from a minimal forkserver (or spawn) template instead of
+# forking the whole Streamlit process
+MP_CONTEXT = mp.get_context('forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn')
+
+
+def get_worker_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the session's persistent worker pool, resizing it if needed"""
+    pool = st.session_state.get('worker_pool')
+    if pool is not None and st.session_state.get('worker_pool_size') == workers:
+        return pool
+    
+    if pool is not None:
+        pool.shutdown(wait=False)
+    
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=MP_CONTEXT,
+                               initializer=init_worker, initargs=worker_init_args(workers))
+    st.session_state.worker_pool = pool
+    st.session_state.worker_pool_size = workers
+    return pool
+
+
+@st.cache_data(show_spinner=False)
+def cached_video_info(_processor: VideoProcessor, video_path: str, mtime: float, size: int):
+    """Video metadata cached on path, mtime and size so reruns skip re-opening the file"""
+    return _processor.get_video_info(video_path)
+
+
+def render_live_metrics(monitor: PerformanceMonitor):
+    """Current system status and history chart, rerun on its own when live"""
+    current_metrics = monitor.get_current_metrics()
+    cpu_history, memory_history = monitor.get_cpu_mem_arrays()
+    
+    # Always show current metrics
+    st.markdown("### 📈 Current System Status")
+    
+    # Create real-time metric display. Streamlit drops elements a rerun does
+    # not re-emit, so the block is always sent, but its markup is only rebuilt
+    # once a reading moves by a whole percent and identical markup is not
+    # re-rendered by the browser
+    metrics_key = (round(current_metrics['cpu_percent']),
+                   round(current_metrics['memory_percent']),
+                   round(current_metrics['disk_percent']))
+    if st.session_state.get('last_metrics_key') != metrics_key:
+        st.session_state.last_metrics_key = metrics_key
+        st.session_state.current_metrics_html = _METRICS_TEMPLATE.format(
+            cpu=current_metrics['cpu_percent'],
+            cores=current_metrics['cpu_count'],
+            mem=current_metrics['memory_percent'],
+            free=current_metrics['memory_available_gb'],
+            disk=current_metrics['disk_percent'],
+            used=current_metrics['disk_used_gb']
+        )
+    st.markdown(st.session_state.current_metrics_html, unsafe_allow_html=True)
+    
+    # System health indicator
+    cpu_health = "🟢 Good" if current_metrics['cpu_percent'] < 70 else "🟡 High" if current_metrics['cpu_percent'] < 90 else "🔴 Critical"
+    memory_health = "🟢 Good" if current_metrics['memory_percent'] < 70 else "🟡 High" if current_metrics['memory_percent'] < 90 else "🔴 Critical"
+    
+    st.markdown(f"""
+    **System Health**: CPU: {cpu_health} | Memory: {memory_health} | 
+    Last updated: {time.strftime('%H:%M:%S')}
+    """)
+    
+    # Show historical chart once enough samples exist
+    perf_chart = UIComponents.create_performance_chart(cpu_history, memory_history)
+    if perf_chart:
+        st.markdown("### 📊 Performance History")
+        st.plotly_chart(perf_chart, use_container_width=True)
+    else:
+        st.info("📊 Historical data will appear after a few monitoring cycles...")
+
 
 def main():
     """Main application function"""
@@ -67,35 +174,40 @@ def main():
         
         # System status
         st.markdown("### 📊 System Status")
-        st.metric("CPU", f"{current_metrics['cpu_percent']:.1f}%")
-        st.metric("Memory", f"{current_metrics['memory_percent']:.1f}%")
+        cpu_col, mem_col = st.columns(2)
+        cpu_col.metric("CPU", f"{current_metrics['cpu_percent']:.1f}%")
+        mem_col.metric("Memory", f"{current_metrics['memory_percent']:.1f}%")
         
         # Configuration
         st.markdown("### 🔧 Processing Settings")
         
-        workers = st.slider(
-            "🔧 Parallel Workers",
-            min_value=1,
-            max_value=16,
-            value=4,
-            help="Number of parallel workers for processing"
-        )
-        
-        segment_duration = st.slider(
-            "⏱️ Segment Duration (seconds)",
-            min_value=5.0,
-            max_value=30.0,
-            value=10.0,
-            step=1.0,
-            help="Duration of each video segment"
-        )
-        
-        filter_type = st.selectbox(
-            "🎨 Video Filter",
-            options=["grayscale", "brightness", "blur", "contrast", "none"],
-            index=0,
-            help="Select the filter to apply to the video"
-        )
+        # Settings only apply on submit, so dragging a slider does not rerun the page
+        with st.form("processing_settings"):
+            workers = st.slider(
+                "🔧 Parallel Workers",
+                min_value=1,
+                max_value=16,
+                value=4,
+                help="Number of parallel workers for processing"
+            )
+            
+            segment_duration = st.slider(
+                "⏱️ Segment Duration (seconds)",
+                min_value=5.0,
+                max_value=30.0,
+                value=10.0,
+                step=1.0,
+                help="Duration of each video segment"
+            )
+            
+            filter_type = st.selectbox(
+                "🎨 Video Filter",
+                options=["grayscale", "brightness", "blur", "contrast", "none"],
+                index=0,
+                help="Select the filter to apply to the video"
+            )
+            
+            st.form_submit_button("✅ Apply Settings", use_container_width=True)
         
         # Export options
         st.markdown("### 📊 Export & Analysis")
@@ -109,14 +221,11 @@ def main():
         st.session_state.enable_realtime = enable_realtime
         
         if st.button("📈 Export Performance Report"):
-            filename = monitor.export_metrics()
-            with open(filename, 'r') as f:
-                report_data = f.read()
-            
+            # The report goes straight to the browser; nothing is written to disk
             st.download_button(
                 "📥 Download Report",
-                data=report_data,
-                file_name=filename,
+                data=monitor.export_metrics_bytes(),
+                file_name=f"performance_metrics_{int(time.time())}.json",
                 mime="application/json"
             )
     
@@ -130,30 +239,41 @@ def main():
     )
     
     if uploaded_file is not None:
-        # Save uploaded file
-        video_path = f"uploads/{uploaded_file.name}"
-        os.makedirs("uploads", exist_ok=True)
-        
-        with open(video_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # Save uploaded file. uploads/ is shared by all sessions, so the path
+        # carries the upload's file_id: another video with the same name and
+        # size must not reuse this file or its cached analysis
+        video_path = f"uploads/{uploaded_file.file_id}_{uploaded_file.name}"
+        
+        # Only write the upload once; reruns keep the same file and mtime
+        try:
+            saved = os.stat(video_path).st_size == uploaded_file.size
+        except FileNotFoundError:
+            saved = False
+        
+        if not saved:
+            uploaded_file.seek(0)
+            with open(video_path, "wb") as f:
+                shutil.copyfileobj(uploaded_file, f, length=UPLOAD_CHUNK_BYTES)
         
         # Analyze video
         with st.spinner("📊 Analyzing video..."):
-            video_info = video_processor.get_video_info(video_path)
-            
-            if video_info is None:
-                st.error("❌ Could not analyze video. Please try a different format.")
-                return
+            stat = os.stat(video_path)
+            video_info = cached_video_info(video_processor, video_path, stat.st_mtime, stat.st_size)
+        
+        if video_info is None:
+            st.error("❌ Could not analyze video. Please try a different format.")
+            return
         
         # Display video information
         st.success(f"✅ Video analyzed: {uploaded_file.name}")
         
-        # Video info metrics - display in rows to avoid nesting
-        st.metric("Duration", f"{video_info['duration']:.1f}s")
-        st.metric("Resolution", f"{video_info['width']}x{video_info['height']}")
-        st.metric("FPS", f"{video_info['fps']:.1f}")
+        # Video info metrics - one columns row, one layout pass
         segments = int(video_info['duration'] / segment_duration) + 1
-        st.metric("Segments", segments)
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Duration", f"{video_info['duration']:.1f}s")
+        c2.metric("Resolution", f"{video_info['width']}x{video_info['height']}")
+        c3.metric("FPS", f"{video_info['fps']:.1f}")
+        c4.metric("Segments", segments)
         
         # Processing buttons
         st.markdown("### 🚀 Start Processing")
@@ -213,9 +333,6 @@ def main():
     st.markdown("---")
     st.markdown("## 📊 Real-Time System Monitoring")
     
-    # Check if real-time monitoring is enabled
-    enable_realtime = st.session_state.get('enable_realtime', True)
-    
     # Add refresh controls
     col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
@@ -229,58 +346,12 @@ def main():
     with col3:
         auto_refresh = st.button("🔄 Auto-Refresh (3s)")
     
-    # Get current metrics and display
-    current_metrics = monitor.get_current_metrics()
-    metrics_history = monitor.get_metrics_history()
-    
-    # Always show current metrics
-    st.markdown("### 📈 Current System Status")
-    
-    # Create real-time metric display
-    current_metrics_html = f"""
-    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; margin: 1rem 0;">
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
-            <h4>💻 CPU Usage</h4>
-            <h2>{current_metrics['cpu_percent']:.1f}%</h2>
-            <p>{current_metrics['cpu_count']} cores</p>
-        </div>
-        <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
-            <h4>🧠 Memory Usage</h4>
-            <h2>{current_metrics['memory_percent']:.1f}%</h2>
-            <p>{current_metrics['memory_available_gb']:.1f} GB free</p>
-        </div>
-        <div style="background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
-            <h4>💾 Disk Usage</h4>
-            <h2>{current_metrics['disk_percent']:.1f}%</h2>
-            <p>{current_metrics['disk_used_gb']:.0f} GB used</p>
-        </div>
-    </div>
-    """
-    st.markdown(current_metrics_html, unsafe_allow_html=True)
-    
-    # System health indicator
-    cpu_health = "🟢 Good" if current_metrics['cpu_percent'] < 70 else "🟡 High" if current_metrics['cpu_percent'] < 90 else "🔴 Critical"
-    memory_health = "🟢 Good" if current_metrics['memory_percent'] < 70 else "🟡 High" if current_metrics['memory_percent'] < 90 else "🔴 Critical"
-    
-    st.markdown(f"""
-    **System Health**: CPU: {cpu_health} | Memory: {memory_health} | 
-    Last updated: {time.strftime('%H:%M:%S')}
-    """)
-    
-    # Show historical chart if available
-    if len(metrics_history) > 1:
-        st.markdown("### 📊 Performance History")
-        perf_chart = UIComponents.create_performance_chart(metrics_history)
-        if perf_chart:
-            st.plotly_chart(perf_chart, use_container_width=True)
-    else:
-        st.info("📊 Historical data will appear after a few monitoring cycles...")
-    
-    # Auto-refresh mechanism
+    # Live monitoring reruns only the status fragment every 3s, not the whole page
     if auto_refresh or (enable_realtime and 'auto_refresh_active' in st.session_state):
         st.session_state.auto_refresh_active = True
-        time.sleep(3)
-        st.rerun()
+        st.fragment(run_every=3)(render_live_metrics)(monitor)
+    else:
+        render_live_metrics(monitor)
 
 
 def run_performance_comparison(video_path: str, filter_type: str, workers: int, segment_duration: float):
@@ -338,6 +409,8 @@ def run_performance_comparison(video_path: str, filter_type: str, workers: int,
         # Split video
         st.info("🎬 Splitting video into segments...")
         video_processor.segment_duration = segment_duration
+        # Both phases run each segment on one worker's share of the cores
+        video_processor.encoder_threads = threads_per_worker(workers)
         segments, duration = video_processor.split_video(video_path)
         segments_count = len(segments)
         
@@ -355,31 +428,33 @@ def run_performance_comparison(video_path: str, filter_type: str, workers: int,
         
         seq_status_placeholder.markdown("*🔄 Starting sequential processing...*")
         
+        # Output paths are built once, outside the timed loops
+        seq_paths = [f"output/seq_{i:03d}.mp4" for i in range(segments_count)]
+        par_paths = [f"output/par_{i:03d}.mp4" for i in range(segments_count)]
+        
         start_seq = time.time()
         
         # Process sequentially with real-time timer updates
         processed_seq = []
+        last_ui_update = 0.0
         for i, segment in enumerate(segments):
-            current_time = time.time() - start_seq
-            
-            # Update timer in real-time
-            seq_timer_placeholder.markdown(f"**⏱️ {current_time:.1f} seconds** - *Processing segment {i+1}/{segments_count}*")
-            seq_status_placeholder.markdown(f"*🔄 Processing segment {i+1} of {segments_count} sequentially...*")
+            now = time.time()
+            current_time = now - start_seq
             
-            # Update progress
-            progress = 0.1 + (0.7 * (i + 1) / segments_count)
-            seq_progress.progress(progress)
-            seq_progress_text.text(f"Completed {i+1}/{segments_count} segments ({progress*100:.0f}%)")
+            # Update timer and progress at most every 0.25s of wall-clock time
+            if now - last_ui_update > 0.25:
+                last_ui_update = now
+                seq_timer_placeholder.markdown(f"**⏱️ {current_time:.1f} seconds** - *Processing segment {i+1}/{segments_count}*")
+                seq_status_placeholder.markdown(f"*🔄 Processing segment {i+1} of {segments_count} sequentially...*")
+                
+                progress = 0.1 + (0.7 * (i + 1) / segments_count)
+                seq_progress.progress(progress)
+                seq_progress_text.text(f"Completed {i+1}/{segments_count} segments ({progress*100:.0f}%)")
             
             # Process the segment
-            output_file = os.path.join("output", f"seq_{i:03d}.mp4")
-            os.makedirs("output", exist_ok=True)
-            result = video_processor.process_segment((i, segment, output_file, filter_type))
+            result = video_processor.process_segment((i, segment, seq_paths[i], filter_type))
             if result:
                 processed_seq.append(result)
-            
-            # Small delay to show the timer updating
-            time.sleep(0.1)
         
         sequential_time = time.time() - start_seq
         
@@ -411,66 +486,86 @@ def run_performance_comparison(video_path: str, filter_type: str, workers: int,
         start_par = time.time()
         
         # Prepare parallel tasks
-        par_tasks = []
-        for i, segment in enumerate(segments):
-            output_file = os.path.join("output", f"par_{i:03d}.mp4")
-            par_tasks.append((i, segment, output_file, filter_type))
-        
-        # TRUE parallel processing with real-time monitoring
-        freeze_support()
-        with Pool(workers) as pool:
-            # Start async processing
-            result_async = pool.map_async(video_processor.process_segment, par_tasks)
+        par_tasks = [(i, segment, par_paths[i], filter_type) for i, segment in enumerate(segments)]
+        
+        # TRUE parallel processing on the session's persistent worker pool
+        pool = get_worker_pool(workers)
+        expected_parallel_time = sequential_time / max(1, workers * 0.8)  # 80% efficiency
+        
+        # Real-time updates as segments complete, in completion order; the
+        # wait timeout keeps the timer ticking between completions. Results
+        # are still stored by segment index for the merge
+        futures = {pool.submit(video_processor.process_segment, task): i for i, task in enumerate(par_tasks)}
+        processed_par = [None] * len(par_tasks)
+        pending = set(futures)
+        completed = 0
+        last_comparison = None
+        last_ui_update = 0.0
+        while pending:
+            done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            try:
+                for future in done:
+                    processed_par[futures[future]] = future.result()
+            except BrokenProcessPool:
+                # A worker died (OOM, codec crash) and the pool rejects all
+                # further work; drop it so the next run builds a fresh one
+                st.session_state.pop('worker_pool', None)
+                pool.shutdown(wait=False)
+                video_processor.cleanup_temp_files_async(segments + [video_path])
+                st.error("❌ A parallel worker crashed. Please run the comparison again.")
+                return
+            completed += len(done)
+            now = time.time()
+            current_par_time = now - start_par
             
-            # Real-time updates while processing
-            update_count = 0
-            while not result_async.ready():
-                current_par_time = time.time() - start_par
-                update_count += 1
-                
-                # Update parallel timer
-                par_timer_placeholder.markdown(f"**⏱️ {current_par_time:.1f} seconds** - *{workers} workers processing simultaneously...*")
-                par_status_placeholder.markdown(f"*⚡ All {segments_count} segments being processed in parallel...*")
+            # Throttle UI updates to wall-clock deltas
+            if now - last_ui_update <= 0.25:
+                continue
+            last_ui_update = now
+            
+            # Update parallel timer
+            par_timer_placeholder.markdown(f"**⏱️ {current_par_time:.1f} seconds** - *{workers} workers processing simultaneously...*")
+            par_status_placeholder.markdown(f"*⚡ {completed} of {segments_count} segments completed in parallel...*")
+            
+            # Progress reflects segments actually completed
+            progress = 0.1 + (0.7 * completed / segments_count)
+            par_progress.progress(progress)
+            par_progress_text.text(f"⚡ Parallel processing: {workers} workers active ({progress*100:.0f}%)")
+            
+            # Live comparison with dramatic messaging
+            if current_par_time < sequential_time:
+                time_diff = sequential_time - current_par_time
+                speedup_so_far = sequential_time / max(current_par_time, 0.1)
+                comparison = f"""
+                # 🏆 **PARALLEL IS DOMINATING!**
                 
-                # Estimate progress based on expected parallel speedup
-                expected_parallel_time = sequential_time / max(1, workers * 0.8)  # 80% efficiency
-                progress_estimate = min(0.8, 0.1 + (0.7 * current_par_time / expected_parallel_time))
-                par_progress.progress(progress_estimate)
-                par_progress_text.text(f"⚡ Parallel processing: {workers} workers active ({progress_estimate*100:.0f}%)")
+                | Metric | Sequential | Parallel | Advantage |
+                |--------|------------|----------|-----------|
+                | Time | {sequential_time:.1f}s | {current_par_time:.1f}s | **{time_diff:.1f}s faster** |
+                | Method | One-by-one | {workers} simultaneous | **{speedup_so_far:.1f}x speedup** |
+                | Status | ✅ Finished | ⚡ **RACING AHEAD** | 🏁 **WINNING** |
                 
-                # Live comparison with dramatic messaging
-                if current_par_time < sequential_time:
-                    time_diff = sequential_time - current_par_time
-                    speedup_so_far = sequential_time / max(current_par_time, 0.1)
-                    comparison_placeholder.markdown(f"""
-                    # 🏆 **PARALLEL IS DOMINATING!**
-                    
-                    | Metric | Sequential | Parallel | Advantage |
-                    |--------|------------|----------|-----------|
-                    | Time | {sequential_time:.1f}s | {current_par_time:.1f}s | **{time_diff:.1f}s faster** |
-                    | Method | One-by-one | {workers} simultaneous | **{speedup_so_far:.1f}x speedup** |
-                    | Status | ✅ Finished | ⚡ **RACING AHEAD** | 🏁 **WINNING** |
-                    
-                    ### ⚡ **PARALLEL PROCESSING POWER IN ACTION!**
-                    """)
-                else:
-                    comparison_placeholder.markdown(f"""
-                    # ⚡ **PARALLEL PROCESSING IN PROGRESS...**
-                    
-                    - 🐢 Sequential: {sequential_time:.1f}s (completed)
-                    - ⚡ Parallel: {current_par_time:.1f}s (processing...)
-                    - 🔥 {workers} workers running simultaneously
-                    - 📊 Expected completion: ~{expected_parallel_time:.1f}s
-                    """)
+                ### ⚡ **PARALLEL PROCESSING POWER IN ACTION!**
+                """
+            else:
+                comparison = f"""
+                # ⚡ **PARALLEL PROCESSING IN PROGRESS...**
                 
-                # Update every 100ms for smooth real-time feel
-                time.sleep(0.1)
-            
-            # Get results and filter out None values
-            processed_par = result_async.get()
-            processed_par = [p for p in processed_par if p is not None]
+                - 🐢 Sequential: {sequential_time:.1f}s (completed)
+                - ⚡ Parallel: {current_par_time:.1f}s (processing...)
+                - 🔥 {workers} workers running simultaneously
+                - 📊 Expected completion: ~{expected_parallel_time:.1f}s
+                """
             
-            print(f"Parallel processing completed: {len(processed_par)} valid segments out of {len(par_tasks)}")
+            # Only re-send the comparison when the visible numbers changed
+            if comparison != last_comparison:
+                comparison_placeholder.markdown(comparison)
+                last_comparison = comparison
+        
+        # Filter out failed segments
+        processed_par = [p for p in processed_par if p is not None]
+        
+        print(f"Parallel processing completed: {len(processed_par)} valid segments out of {len(par_tasks)}")
         
         parallel_time = time.time() - start_par
         
@@ -568,22 +663,19 @@ def run_performance_comparison(video_path: str, filter_type: str, workers: int,
             st.balloons()
             
             # Show final video
-            if os.path.exists(final_video):
+            if final_video:
                 st.markdown("### 🎬 Final Processed Video")
                 st.video(final_video)
                 
-                with open(final_video, "rb") as f:
-                    st.download_button(
-                        "📥 Download Processed Video",
-                        data=f.read(),
-                        file_name=os.path.basename(final_video),
-                        mime="video/mp4"
-                    )
-        
-        # Cleanup
-        video_processor.cleanup_temp_files(segments)
-        if os.path.exists(video_path):
-            os.remove(video_path)
+                st.download_button(
+                    "📥 Download Processed Video",
+                    data=Path(final_video).read_bytes,
+                    file_name=os.path.basename(final_video),
+                    mime="video/mp4"
+                )
+        
+        # Cleanup runs in the background so results show without waiting on unlinks
+        video_processor.cleanup_temp_files_async(segments + [video_path])
             
     except Exception as e:
         st.error(f"Processing failed: {e}")
@@ -603,4 +695,5 @@ def run_benchmark_suite(video_path: str, filter_type: str):
 
 
 if __name__ == "__main__":
+    freeze_support()
     main()
\ No newline at end of file
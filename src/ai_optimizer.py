@@ -3,52 +3,128 @@ AI Performance Optimizer
 Provides intelligent recommendations for optimal video processing
 """
 
+import time
+import functools
 import psutil
 import numpy as np
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Dict, List, Any, Tuple, Literal
+
+
+# Relative processing cost of each filter (read-only)
+FILTER_FACTORS = MappingProxyType({
+    'grayscale': 0.8,
+    'brightness': 1.0,
+    'blur': 1.3,
+    'contrast': 1.1,
+    'none': 0.7
+})
+
+
+# Load thresholds (percent) used by the worker policy and recommendations
+CPU_HIGH_PERCENT = 80
+CPU_LOW_PERCENT = 30
+MEMORY_CRITICAL_PERCENT = 85
+MEMORY_HIGH_PERCENT = 70
+
+# Efficiency rating cut-offs, highest first; anything below is "Poor"
+RATING_BANDS = ((80, "Excellent"), (60, "Good"), (40, "Fair"))
+
+# Blocking CPU sample length. psutil keeps non-blocking cpu_percent state per
+# thread, and the shared optimizer is called from short-lived script threads,
+# so it measures its own interval; system_info caches the result for `ttl`
+CPU_SAMPLE_SECONDS = 0.1
+
+# Never run more workers than hardware threads, and no more than 16 even on
+# many-core machines where extra workers only add contention
+MAX_WORKERS = min(psutil.cpu_count(logical=True) or 1, 16)
+
+# Bin edges for the worker policy: CPU % (<=30, <=80, >80),
+# memory % (<=70, <=85, >85) and pixels (<=720p, <=1080p, >1080p)
+_CPU_BINS = (CPU_LOW_PERCENT, CPU_HIGH_PERCENT)
+_MEMORY_BINS = (MEMORY_HIGH_PERCENT, MEMORY_CRITICAL_PERCENT)
+_RESOLUTION_BINS = (921600, 2073600)
+
+# Worker counts indexed by [cpu_bin, mem_bin, res_bin], capped by MAX_WORKERS
+_POLICY = np.array([
+    [[16, 16, 4], [12, 12, 4], [4, 4, 2]],
+    [[8, 8, 4], [6, 6, 4], [4, 4, 2]],
+    [[4, 4, 2], [3, 3, 2], [2, 2, 1]],
+], dtype=np.int8)
+_POLICY.flags.writeable = False
+
+
+# Share of the work assumed to parallelize across segments
+PARALLEL_FRACTION = 0.9
+
+
+def _amdahl(workers, parallel_fraction: float):
+    """Amdahl's law: fixed problem size, serial part caps the speedup"""
+    return 1 / ((1 - parallel_fraction) + (parallel_fraction / workers))
+
+
+def _gustafson(workers, parallel_fraction: float):
+    """Gustafson's law: problem size grows with the worker count"""
+    return workers - (1 - parallel_fraction) * (workers - 1)
+
+
+SPEEDUP_LAWS = MappingProxyType({
+    'amdahl': _amdahl,
+    'gustafson': _gustafson
+})
+
+
+def _predict(workers: np.ndarray, parallel_fraction: float, base_time: float,
+             system_efficiency: float, law: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized speedup and estimated time for an array of worker counts"""
+    speedup = SPEEDUP_LAWS[law](workers, parallel_fraction)
+    speedup *= (0.5 + 0.5 * system_efficiency)
+    return speedup, base_time / speedup
 
 
 class AIOptimizer:
     """AI-powered performance optimization system"""
     
-    def __init__(self):
-        self.system_info = self._get_system_info()
+    def __init__(self, ttl: float = 10.0):
+        self.ttl = ttl
+        self._cache = None
+        self._cache_ts = 0.0
+    
+    @property
+    def system_info(self) -> Dict[str, Any]:
+        """System information, refreshed at most once every `ttl` seconds"""
+        now = time.monotonic()
+        if self._cache is None or now - self._cache_ts > self.ttl:
+            self._cache = self._get_system_info()
+            self._cache_ts = now
+        return self._cache
     
     def _get_system_info(self) -> Dict[str, Any]:
         """Get current system information"""
+        try:
+            disk = psutil.disk_usage('/')
+        except OSError:
+            disk = None
+        
         return {
             'cpu_count': psutil.cpu_count(),
-            'cpu_percent': psutil.cpu_percent(interval=1),
+            'cpu_percent': psutil.cpu_percent(interval=CPU_SAMPLE_SECONDS),
             'memory': psutil.virtual_memory(),
-            'disk': psutil.disk_usage('/') if psutil.disk_usage else None
+            'disk': disk
         }
     
     def get_optimal_workers(self, video_info: Dict[str, Any] = None) -> int:
         """Calculate optimal number of workers based on system resources"""
-        cpu_count = self.system_info['cpu_count']
-        cpu_usage = self.system_info['cpu_percent']
         memory_percent = self.system_info['memory'].percent
+        cpu_bin = int(np.digitize(self.system_info['cpu_percent'], _CPU_BINS, right=True))
+        mem_bin = int(np.digitize(memory_percent, _MEMORY_BINS, right=True))
         
-        # Base recommendation on CPU cores
-        optimal_workers = cpu_count
-        
-        # Adjust based on current system load
-        if cpu_usage > 80:
-            optimal_workers = max(2, cpu_count // 2)
-        elif cpu_usage < 30:
-            optimal_workers = min(8, cpu_count)
-        
-        # Adjust based on memory usage
-        if memory_percent > 85:
-            optimal_workers = max(2, optimal_workers // 2)
-        
-        # Adjust based on video characteristics
+        resolution = 0
         if video_info:
             resolution = video_info.get('width', 0) * video_info.get('height', 0)
-            if resolution > 2073600:  # 1920x1080
-                optimal_workers = min(optimal_workers, 4)
+        res_bin = int(np.digitize(resolution, _RESOLUTION_BINS, right=True))
         
-        return max(1, min(optimal_workers, 8))
+        return max(1, min(int(_POLICY[cpu_bin, mem_bin, res_bin]), MAX_WORKERS))
     
     def recommend_filter(self, video_info: Dict[str, Any]) -> str:
         """Recommend optimal filter based on video characteristics"""
@@ -74,11 +150,8 @@ class AIOptimizer:
         # Default for standard videos
         return "blur"
     
-    def predict_performance(self, video_info: Dict[str, Any], workers: int, filter_type: str) -> Dict[str, float]:
-        """Predict processing performance"""
-        if not video_info:
-            return {'estimated_time': 0, 'predicted_speedup': 1.0, 'confidence': 0.5}
-        
+    def _base_time(self, video_info: Dict[str, Any], filter_type: str) -> float:
+        """Estimate single-worker processing time for a video"""
         duration = video_info.get('duration', 60)
         resolution = video_info.get('width', 1920) * video_info.get('height', 1080)
         
@@ -90,35 +163,48 @@ class AIOptimizer:
         base_time *= resolution_factor
         
         # Adjust for filter complexity
-        filter_factors = {
-            'grayscale': 0.8,
-            'brightness': 1.0,
-            'blur': 1.3,
-            'contrast': 1.1,
-            'none': 0.7
-        }
-        base_time *= filter_factors.get(filter_type, 1.0)
+        return base_time * FILTER_FACTORS.get(filter_type, 1.0)
+    
+    def predict_performance(self, video_info: Dict[str, Any], workers: int, filter_type: str,
+                            law: Literal['amdahl', 'gustafson'] = 'gustafson') -> Dict[str, float]:
+        """Predict processing performance under Amdahl's or Gustafson's law"""
+        if not video_info:
+            return {'estimated_time': 0, 'predicted_speedup': 1.0, 'confidence': 0.5}
         
-        # Calculate parallel speedup (Amdahl's law approximation)
-        parallel_fraction = 0.9  # Assume 90% of work is parallelizable
-        predicted_speedup = 1 / ((1 - parallel_fraction) + (parallel_fraction / workers))
+        base_time = self._base_time(video_info, filter_type)
         
-        # Adjust for system limitations
+        # Calculate parallel speedup, adjusted for system limitations. Segment
+        # processing scales out with the video, so Gustafson is the default;
+        # Amdahl gives the pessimistic fixed-size estimate
         system_efficiency = min(1.0, (100 - self.system_info['cpu_percent']) / 100)
-        predicted_speedup *= (0.5 + 0.5 * system_efficiency)
-        
-        estimated_time = base_time / predicted_speedup
+        speedup, estimated = _predict(np.array([workers], dtype=np.float64), PARALLEL_FRACTION,
+                                      base_time, system_efficiency, law)
         
         # Confidence based on system stability
         confidence = 0.7 + 0.3 * system_efficiency
         
         return {
-            'estimated_time': estimated_time,
-            'predicted_speedup': predicted_speedup,
+            'estimated_time': float(estimated[0]),
+            'predicted_speedup': float(speedup[0]),
             'confidence': confidence,
             'base_time': base_time
         }
     
+    def predict_scaling_curve(self, video_info: Dict[str, Any], worker_counts: np.ndarray,
+                              filter_type: str,
+                              law: Literal['amdahl', 'gustafson'] = 'gustafson') -> Dict[str, np.ndarray]:
+        """Predict speedup and processing time across a sweep of worker counts"""
+        workers = np.asarray(worker_counts, dtype=np.float64)
+        if not video_info:
+            return {'workers': workers, 'predicted_speedup': np.ones_like(workers),
+                    'estimated_time': np.zeros_like(workers)}
+        
+        base_time = self._base_time(video_info, filter_type)
+        system_efficiency = min(1.0, (100 - self.system_info['cpu_percent']) / 100)
+        speedup, estimated = _predict(workers, PARALLEL_FRACTION, base_time, system_efficiency, law)
+        
+        return {'workers': workers, 'predicted_speedup': speedup, 'estimated_time': estimated}
+    
     def get_system_recommendations(self) -> List[Dict[str, str]]:
         """Get system-specific recommendations"""
         recommendations = []
@@ -126,14 +212,14 @@ class AIOptimizer:
         cpu_usage = self.system_info['cpu_percent']
         memory_percent = self.system_info['memory'].percent
         
-        if cpu_usage > 80:
+        if cpu_usage > CPU_HIGH_PERCENT:
             recommendations.append({
                 'type': 'warning',
                 'title': 'High CPU Usage',
                 'message': f'CPU usage is {cpu_usage:.1f}%. Consider reducing worker count.',
                 'action': 'reduce_workers'
             })
-        elif cpu_usage < 30:
+        elif cpu_usage < CPU_LOW_PERCENT:
             recommendations.append({
                 'type': 'optimization',
                 'title': 'CPU Underutilized',
@@ -141,14 +227,14 @@ class AIOptimizer:
                 'action': 'increase_workers'
             })
         
-        if memory_percent > 85:
+        if memory_percent > MEMORY_CRITICAL_PERCENT:
             recommendations.append({
                 'type': 'critical',
                 'title': 'Memory Critical',
                 'message': f'Memory usage is {memory_percent:.1f}%. Risk of system instability.',
                 'action': 'reduce_segments'
             })
-        elif memory_percent > 70:
+        elif memory_percent > MEMORY_HIGH_PERCENT:
             recommendations.append({
                 'type': 'warning',
                 'title': 'High Memory Usage',
@@ -166,24 +252,24 @@ class AIOptimizer:
         
         return recommendations
     
-    def calculate_efficiency_score(self, actual_speedup: float, workers: int) -> Dict[str, float]:
-        """Calculate processing efficiency metrics"""
-        theoretical_max = workers * 0.9  # 90% theoretical maximum
+    def calculate_efficiency_score(self, actual_speedup: float, workers: int,
+                                   law: Literal['amdahl', 'gustafson'] = 'gustafson') -> Dict[str, float]:
+        """Calculate processing efficiency metrics against the chosen law's ceiling"""
+        theoretical_max = float(SPEEDUP_LAWS[law](workers, PARALLEL_FRACTION)) if workers > 0 else 0
         efficiency = (actual_speedup / theoretical_max) * 100 if theoretical_max > 0 else 0
         
         # Performance rating
-        if efficiency >= 80:
-            rating = "Excellent"
-        elif efficiency >= 60:
-            rating = "Good"
-        elif efficiency >= 40:
-            rating = "Fair"
-        else:
-            rating = "Poor"
+        rating = next((label for cutoff, label in RATING_BANDS if efficiency >= cutoff), "Poor")
         
         return {
             'efficiency_percent': efficiency,
             'theoretical_max': theoretical_max,
             'rating': rating,
             'worker_utilization': (actual_speedup / workers) * 100 if workers > 0 else 0
-        }
\ No newline at end of file
+        }
+
+
+@functools.lru_cache(maxsize=1)
+def get_optimizer() -> AIOptimizer:
+    """Process-wide AIOptimizer shared by every session and rerun"""
+    return AIOptimizer()
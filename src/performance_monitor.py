@@ -3,23 +3,92 @@ Performance Monitoring System
 Real-time system metrics and performance tracking
 """
 
+import os
+import json
 import time
 import psutil
+import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
 import threading
 from collections import deque
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 
+# Columnar layout of one monitor sample (percentages and sizes in GB)
+SAMPLE_DTYPE = np.dtype([
+    ('timestamp', 'f8'),
+    ('cpu_percent', 'f4'),
+    ('memory_percent', 'f4'),
+    ('memory_used_gb', 'f4'),
+    ('memory_total_gb', 'f4'),
+    ('memory_available_gb', 'f4'),
+    ('disk_percent', 'f4'),
+    ('disk_used_gb', 'f4'),
+    ('disk_total_gb', 'f4')
+])
+
+
+# Health score cut-offs, highest first; anything below is "Poor"
+HEALTH_STATUS_BANDS = ((80, "Excellent"), (60, "Good"), (40, "Fair"))
+
+# (metric, threshold percent, recommendation) checked against the latest sample
+HEALTH_WARNINGS = (
+    ('cpu_percent', 80, "High CPU usage - consider reducing workload"),
+    ('memory_percent', 85, "High memory usage - close unnecessary applications"),
+    ('disk_percent', 90, "Low disk space - free up storage")
+)
+
+# Load columns averaged into the health score
+_LOAD_FIELDS = ['cpu_percent', 'memory_percent', 'disk_percent']
+
+# Blocking CPU sample (seconds) used when the monitor thread has no sample yet
+CPU_FALLBACK_INTERVAL = 0.1
+
+
 class PerformanceMonitor:
     """Real-time performance monitoring and metrics collection"""
     
-    def __init__(self, max_history: int = 100):
+    def __init__(self, max_history: int = 100, disk_refresh_interval: float = 30.0,
+                 history_spill_path: Optional[str] = None, spill_max_bytes: int = 1024 * 1024):
         self.max_history = max_history
-        self.system_metrics = deque(maxlen=max_history)
-        self.processing_history = []
+        self.disk_refresh_interval = disk_refresh_interval
+        
+        # Optional JSONL file that receives results evicted from processing_history
+        self.history_spill_path = history_spill_path
+        self.spill_max_bytes = spill_max_bytes
+        
+        # Monitor samples live in a columnar ring buffer; dicts are only built
+        # at the API boundary
+        self._samples = np.zeros(max_history, dtype=SAMPLE_DTYPE)
+        self._sample_count = 0
+        
+        # Dict view of the buffer, reused until the next sample lands
+        self._history_view = ()
+        self._history_view_count = 0
+        self.processing_history = deque(maxlen=max_history)
         self.is_monitoring = False
+        
+        # Running aggregates so the summary does not rescan the history
+        self._count = 0
+        self._speedup_sum = 0.0
+        self._speedup_min = None
+        self._speedup_max = None
+        self._time_saved_sum = 0.0
+        self._last = None
         self.monitor_thread = None
+        self._stop_event = threading.Event()
+        
+        # Constant per process
+        self.cpu_count = psutil.cpu_count()
+        
+        # Disk usage changes slowly, so it is re-read on a much lower cadence
+        self._disk_cache = None
+        self._disk_cache_ts = 0.0
+        
+        # Dict view of the newest sample, reused until the next sample lands
+        self._current_view = None
+        self._current_view_count = 0
     
     def start_monitoring(self, interval: float = 1.0):
         """Start real-time system monitoring"""
@@ -27,6 +96,7 @@ class PerformanceMonitor:
             return
         
         self.is_monitoring = True
+        self._stop_event.clear()
         self.monitor_thread = threading.Thread(
             target=self._monitor_loop, 
             args=(interval,), 
@@ -37,32 +107,44 @@ class PerformanceMonitor:
     def stop_monitoring(self):
         """Stop real-time system monitoring"""
         self.is_monitoring = False
+        self._stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2.0)
     
     def _monitor_loop(self, interval: float):
         """Background monitoring loop"""
-        while self.is_monitoring:
+        # psutil keeps the previous cpu_percent sample per thread, so prime it
+        # here; each non-blocking reading then covers one interval of this thread
+        psutil.cpu_percent(interval=None)
+        
+        # Returns as soon as stop_monitoring() sets the event
+        while not self._stop_event.wait(interval):
             try:
                 metrics = self._collect_system_metrics()
-                self.system_metrics.append(metrics)
-                time.sleep(interval)
+                self._record_sample(metrics)
             except Exception as e:
                 print(f"Monitoring error: {e}")
-                time.sleep(interval)
     
-    def _collect_system_metrics(self) -> Dict[str, Any]:
+    def _get_disk_usage(self):
+        """Get root disk usage, refreshed at most once per disk_refresh_interval"""
+        now = time.monotonic()
+        if self._disk_cache is None or now - self._disk_cache_ts > self.disk_refresh_interval:
+            self._disk_cache = psutil.disk_usage('/')
+            self._disk_cache_ts = now
+        return self._disk_cache
+    
+    def _collect_system_metrics(self, cpu_interval: Optional[float] = None) -> Dict[str, Any]:
         """Collect current system metrics"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            cpu_percent = psutil.cpu_percent(interval=cpu_interval)
             memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            disk = self._get_disk_usage()
             
             return {
                 'timestamp': time.time(),
                 'datetime': datetime.now().isoformat(),
                 'cpu_percent': cpu_percent,
-                'cpu_count': psutil.cpu_count(),
+                'cpu_count': self.cpu_count,
                 'memory_percent': memory.percent,
                 'memory_used_gb': memory.used / (1024**3),
                 'memory_total_gb': memory.total / (1024**3),
@@ -81,27 +163,111 @@ class PerformanceMonitor:
                 'disk_percent': 0
             }
     
+    def _record_sample(self, metrics: Dict[str, Any]):
+        """Write a metrics sample into the ring buffer"""
+        self._samples[self._sample_count % self.max_history] = (
+            metrics['timestamp'],
+            metrics['cpu_percent'],
+            metrics['memory_percent'],
+            metrics.get('memory_used_gb', 0),
+            metrics.get('memory_total_gb', 0),
+            metrics.get('memory_available_gb', 0),
+            metrics['disk_percent'],
+            metrics.get('disk_used_gb', 0),
+            metrics.get('disk_total_gb', 0)
+        )
+        self._sample_count += 1
+    
+    def _ordered_samples(self) -> np.ndarray:
+        """Get buffered samples in chronological order"""
+        count = self._sample_count
+        if count <= self.max_history:
+            return self._samples[:count]
+        
+        start = count % self.max_history
+        return np.concatenate((self._samples[start:], self._samples[:start]))
+    
+    def _sample_to_dict(self, sample: np.void) -> Dict[str, Any]:
+        """Materialize a buffered sample in the get_current_metrics layout"""
+        return {
+            'timestamp': float(sample['timestamp']),
+            'datetime': datetime.fromtimestamp(sample['timestamp']).isoformat(),
+            'cpu_percent': float(sample['cpu_percent']),
+            'cpu_count': self.cpu_count,
+            'memory_percent': float(sample['memory_percent']),
+            'memory_used_gb': float(sample['memory_used_gb']),
+            'memory_total_gb': float(sample['memory_total_gb']),
+            'memory_available_gb': float(sample['memory_available_gb']),
+            'disk_percent': float(sample['disk_percent']),
+            'disk_used_gb': float(sample['disk_used_gb']),
+            'disk_total_gb': float(sample['disk_total_gb'])
+        }
+    
+    def get_cpu_mem_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get CPU and memory usage history as chronological float32 arrays"""
+        samples = self._ordered_samples()
+        return samples['cpu_percent'].copy(), samples['memory_percent'].copy()
+    
     def get_current_metrics(self) -> Dict[str, Any]:
-        """Get current system metrics"""
-        return self._collect_system_metrics()
+        """Get the newest sample taken by the monitor thread"""
+        count = self._sample_count
+        if not count or not self.is_monitoring:
+            # Only the monitor thread's non-blocking CPU readings are meaningful;
+            # a short blocking read is valid from any thread
+            return self._collect_system_metrics(cpu_interval=CPU_FALLBACK_INTERVAL)
+        
+        if count != self._current_view_count:
+            self._current_view = self._sample_to_dict(self._samples[(count - 1) % self.max_history])
+            self._current_view_count = count
+        return self._current_view
     
-    def get_metrics_history(self) -> List[Dict[str, Any]]:
-        """Get historical system metrics"""
-        return list(self.system_metrics)
+    def get_metrics_history(self) -> Tuple[Dict[str, Any], ...]:
+        """Get historical system metrics as a read-only, cached view"""
+        count = self._sample_count
+        if count != self._history_view_count:
+            self._history_view = tuple(self._sample_to_dict(sample) for sample in self._ordered_samples())
+            self._history_view_count = count
+        return self._history_view
     
     def record_processing_result(self, result: Dict[str, Any]):
         """Record a processing result for history"""
         result['timestamp'] = time.time()
         result['datetime'] = datetime.now().isoformat()
+        
+        # The bounded history is about to drop its oldest entry
+        if self.history_spill_path and len(self.processing_history) == self.max_history:
+            self._spill_result(self.processing_history[0])
         self.processing_history.append(result)
+        
+        speedup = result.get('speedup', 0)
+        self._count += 1
+        self._speedup_sum += speedup
+        self._speedup_min = speedup if self._speedup_min is None else min(self._speedup_min, speedup)
+        self._speedup_max = speedup if self._speedup_max is None else max(self._speedup_max, speedup)
+        self._time_saved_sum += result.get('time_saved', 0)
+        self._last = result
+    
+    def _spill_result(self, result: Dict[str, Any]):
+        """Append an evicted result to the spill file, rotating it when full"""
+        try:
+            if os.path.getsize(self.history_spill_path) >= self.spill_max_bytes:
+                os.replace(self.history_spill_path, self.history_spill_path + '.1')
+        except FileNotFoundError:
+            pass
+        
+        try:
+            with open(self.history_spill_path, 'a') as f:
+                f.write(json.dumps(result) + '\n')
+        except OSError as e:
+            print(f"Warning: Could not spill processing result: {e}")
     
     def get_processing_history(self) -> List[Dict[str, Any]]:
         """Get processing history"""
-        return self.processing_history
+        return list(self.processing_history)
     
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get comprehensive performance summary"""
-        if not self.processing_history:
+        if not self._count:
             return {
                 'total_runs': 0,
                 'average_speedup': 0,
@@ -109,47 +275,36 @@ class PerformanceMonitor:
                 'total_time_saved': 0
             }
         
-        speedups = [r.get('speedup', 0) for r in self.processing_history]
-        time_saved = [r.get('time_saved', 0) for r in self.processing_history]
-        
         return {
-            'total_runs': len(self.processing_history),
-            'average_speedup': sum(speedups) / len(speedups) if speedups else 0,
-            'best_speedup': max(speedups) if speedups else 0,
-            'worst_speedup': min(speedups) if speedups else 0,
-            'total_time_saved': sum(time_saved),
-            'average_time_saved': sum(time_saved) / len(time_saved) if time_saved else 0,
-            'last_run': self.processing_history[-1] if self.processing_history else None
+            'total_runs': self._count,
+            'average_speedup': self._speedup_sum / self._count,
+            'best_speedup': self._speedup_max,
+            'worst_speedup': self._speedup_min,
+            'total_time_saved': self._time_saved_sum,
+            'average_time_saved': self._time_saved_sum / self._count,
+            'last_run': self._last
         }
     
-    def get_system_health_score(self) -> Dict[str, Any]:
-        """Calculate system health score"""
-        if not self.system_metrics:
+    def get_system_health_score(self, window: int = 5) -> Dict[str, Any]:
+        """Calculate system health score, smoothed over the last `window` samples"""
+        count = self._sample_count
+        if not count:
             return {'score': 50, 'status': 'Unknown', 'recommendations': []}
         
-        latest = self.system_metrics[-1]
-        cpu_score = max(0, 100 - latest['cpu_percent'])
-        memory_score = max(0, 100 - latest['memory_percent'])
-        disk_score = max(0, 100 - latest['disk_percent'])
+        # Average cpu/memory/disk load over the window in one float32 reduction
+        window = max(1, min(window, self.max_history, count))
+        recent = self._samples[np.arange(count - window, count) % self.max_history]
+        loads = structured_to_unstructured(recent[_LOAD_FIELDS]).mean(axis=0)
+        cpu_score, memory_score, disk_score = np.maximum(0, 100 - loads).tolist()
         
         overall_score = (cpu_score + memory_score + disk_score) / 3
         
-        if overall_score >= 80:
-            status = "Excellent"
-        elif overall_score >= 60:
-            status = "Good"
-        elif overall_score >= 40:
-            status = "Fair"
-        else:
-            status = "Poor"
-        
-        recommendations = []
-        if latest['cpu_percent'] > 80:
-            recommendations.append("High CPU usage - consider reducing workload")
-        if latest['memory_percent'] > 85:
-            recommendations.append("High memory usage - close unnecessary applications")
-        if latest['disk_percent'] > 90:
-            recommendations.append("Low disk space - free up storage")
+        status = next((label for cutoff, label in HEALTH_STATUS_BANDS if overall_score >= cutoff), "Poor")
+        
+        recommendations = [
+            message for key, threshold, message in HEALTH_WARNINGS
+            if recent[-1][key] > threshold
+        ]
         
         return {
             'score': overall_score,
@@ -160,21 +315,41 @@ class PerformanceMonitor:
             'recommendations': recommendations
         }
     
-    def export_metrics(self, filename: str = None) -> str:
-        """Export metrics to JSON file"""
-        if not filename:
-            filename = f"performance_metrics_{int(time.time())}.json"
-        
+    @staticmethod
+    def _atomic_write(filename: str, data: bytes):
+        """Write data to a temp file and rename it over the target"""
+        temp_name = f"{filename}.tmp"
+        try:
+            with open(temp_name, 'wb') as f:
+                f.write(data)
+            os.replace(temp_name, filename)
+        except OSError as e:
+            print(f"Error exporting metrics to {filename}: {e}")
+    
+    def export_metrics_bytes(self) -> bytes:
+        """Serialize the metrics report to JSON bytes without touching disk"""
         export_data = {
             'export_timestamp': datetime.now().isoformat(),
-            'system_metrics': list(self.system_metrics),
-            'processing_history': self.processing_history,
+            'system_metrics': self.get_metrics_history(),
+            'processing_history': list(self.processing_history),
             'performance_summary': self.get_performance_summary(),
             'system_health': self.get_system_health_score()
         }
         
-        import json
-        with open(filename, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        return json.dumps(export_data, indent=2).encode('utf-8')
+    
+    def export_metrics(self, filename: str = None) -> Tuple[str, bytes]:
+        """Export metrics to JSON file, returning the filename and the JSON bytes"""
+        if not filename:
+            filename = f"performance_metrics_{int(time.time())}.json"
+        
+        json_bytes = self.export_metrics_bytes()
+        
+        # The caller already has the bytes, so the disk write happens off-thread
+        threading.Thread(
+            target=self._atomic_write,
+            args=(filename, json_bytes),
+            daemon=True
+        ).start()
         
-        return filename
\ No newline at end of file
+        return filename, json_bytes
\ No newline at end of file
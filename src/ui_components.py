@@ -3,11 +3,160 @@ UI Components and Styling
 Reusable UI components and styling for the Streamlit interface
 """
 
+import functools
 import streamlit as st
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
-from typing import Dict, List, Any
+import numpy as np
+from typing import Dict
+
+
+# Static markup, built once at import; per-call work is a single str.format
+_CSS_SOURCE = """
+<style>
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
+    
+    .main-header {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 2rem;
+        border-radius: 15px;
+        color: white;
+        text-align: center;
+        margin: 1rem 0;
+        font-family: 'Inter', sans-serif;
+        box-shadow: 0 8px 32px rgba(0,0,0,0.1);
+    }
+    
+    .metric-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 1.5rem;
+        border-radius: 12px;
+        color: white;
+        text-align: center;
+        margin: 0.5rem 0;
+        box-shadow: 0 4px 20px rgba(0,0,0,0.1);
+        transition: transform 0.2s ease;
+    }
+    
+    .metric-card:hover {
+        transform: translateY(-2px);
+    }
+    
+    .speedup-card {
+        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+        padding: 1.5rem;
+        border-radius: 12px;
+        color: white;
+        text-align: center;
+        margin: 0.5rem 0;
+        box-shadow: 0 4px 20px rgba(245,87,108,0.2);
+    }
+    
+    .ai-card {
+        background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
+        padding: 1.5rem;
+        border-radius: 12px;
+        color: white;
+        text-align: center;
+        margin: 0.5rem 0;
+        box-shadow: 0 4px 20px rgba(17,153,142,0.2);
+    }
+    
+    .timer-display {
+        font-family: 'Inter', sans-serif;
+        font-size: 2.2rem;
+        font-weight: 700;
+        color: #FFD93D;
+        text-shadow: 0 2px 4px rgba(0,0,0,0.3);
+    }
+    
+    .status-badge {
+        background: linear-gradient(45deg, #FF6B6B, #4ECDC4);
+        padding: 0.4rem 1rem;
+        border-radius: 20px;
+        color: white;
+        font-weight: 600;
+        font-size: 0.9rem;
+        display: inline-block;
+        margin: 0.2rem;
+    }
+    
+    .recommendation-card {
+        background: rgba(255,255,255,0.05);
+        border-left: 4px solid #4ECDC4;
+        padding: 1rem;
+        border-radius: 8px;
+        margin: 0.5rem 0;
+        backdrop-filter: blur(10px);
+    }
+    
+    .performance-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+        gap: 1rem;
+        margin: 1rem 0;
+    }
+</style>
+"""
+
+# Whitespace-collapsed copy of the stylesheet. It has to be sent on every rerun
+# because Streamlit drops elements a rerun does not re-emit, so keep it small.
+_CSS_HTML = " ".join(_CSS_SOURCE.split())
+
+_HEADER_TEMPLATE = """
+<div class="main-header">
+    <h1>{title}</h1>
+    {subtitle_html}
+</div>
+"""
+
+_CARD_TEMPLATE = """
+<div class="{card_type}-card">
+    <h3>{title}</h3>
+    <h1>{value}</h1>
+    {subtitle_html}
+</div>
+"""
+
+_TIMER_TEMPLATE = """
+<div style="text-align: center; margin: 1rem 0;">
+    <div class="timer-display">{time_value:.1f}s</div>
+    {label_html}
+</div>
+"""
+
+_BADGE_COLORS = {
+    'success': '#4CAF50',
+    'warning': '#FF9800',
+    'error': '#F44336',
+    'info': '#2196F3'
+}
+
+_BADGE_TEMPLATE = """
+<span style="
+    background: {color};
+    color: white;
+    padding: 0.3rem 0.8rem;
+    border-radius: 15px;
+    font-size: 0.85rem;
+    font-weight: 600;
+    display: inline-block;
+    margin: 0.2rem;
+">{text}</span>
+"""
+
+_RECOMMENDATION_ICONS = {
+    'success': '✅',
+    'warning': '⚠️',
+    'error': '🚨',
+    'info': '💡',
+    'optimization': '⚡'
+}
+
+_RECOMMENDATION_TEMPLATE = """
+<div class="recommendation-card">
+    <h4>{icon} {title}</h4>
+    <p>{message}</p>
+</div>
+"""
 
 
 class UIComponents:
@@ -16,180 +165,62 @@ class UIComponents:
     @staticmethod
     def load_custom_css():
         """Load custom CSS styling"""
-        st.markdown("""
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-            
-            .main-header {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                padding: 2rem;
-                border-radius: 15px;
-                color: white;
-                text-align: center;
-                margin: 1rem 0;
-                font-family: 'Inter', sans-serif;
-                box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-            }
-            
-            .metric-card {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                padding: 1.5rem;
-                border-radius: 12px;
-                color: white;
-                text-align: center;
-                margin: 0.5rem 0;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-                transition: transform 0.2s ease;
-            }
-            
-            .metric-card:hover {
-                transform: translateY(-2px);
-            }
-            
-            .speedup-card {
-                background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-                padding: 1.5rem;
-                border-radius: 12px;
-                color: white;
-                text-align: center;
-                margin: 0.5rem 0;
-                box-shadow: 0 4px 20px rgba(245,87,108,0.2);
-            }
-            
-            .ai-card {
-                background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
-                padding: 1.5rem;
-                border-radius: 12px;
-                color: white;
-                text-align: center;
-                margin: 0.5rem 0;
-                box-shadow: 0 4px 20px rgba(17,153,142,0.2);
-            }
-            
-            .timer-display {
-                font-family: 'Inter', sans-serif;
-                font-size: 2.2rem;
-                font-weight: 700;
-                color: #FFD93D;
-                text-shadow: 0 2px 4px rgba(0,0,0,0.3);
-            }
-            
-            .status-badge {
-                background: linear-gradient(45deg, #FF6B6B, #4ECDC4);
-                padding: 0.4rem 1rem;
-                border-radius: 20px;
-                color: white;
-                font-weight: 600;
-                font-size: 0.9rem;
-                display: inline-block;
-                margin: 0.2rem;
-            }
-            
-            .recommendation-card {
-                background: rgba(255,255,255,0.05);
-                border-left: 4px solid #4ECDC4;
-                padding: 1rem;
-                border-radius: 8px;
-                margin: 0.5rem 0;
-                backdrop-filter: blur(10px);
-            }
-            
-            .performance-grid {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 1rem;
-                margin: 1rem 0;
-            }
-        </style>
-        """, unsafe_allow_html=True)
+        st.markdown(_CSS_HTML, unsafe_allow_html=True)
     
     @staticmethod
     def create_header(title: str, subtitle: str = ""):
         """Create main application header"""
-        header_html = f"""
-        <div class="main-header">
-            <h1>{title}</h1>
-            {f'<p>{subtitle}</p>' if subtitle else ''}
-        </div>
-        """
+        header_html = _HEADER_TEMPLATE.format(
+            title=title,
+            subtitle_html=f'<p>{subtitle}</p>' if subtitle else ''
+        )
         st.markdown(header_html, unsafe_allow_html=True)
     
     @staticmethod
+    @functools.lru_cache(maxsize=64)
     def create_metric_card(title: str, value: str, subtitle: str = "", card_type: str = "metric"):
         """Create a metric display card"""
-        card_class = f"{card_type}-card"
-        card_html = f"""
-        <div class="{card_class}">
-            <h3>{title}</h3>
-            <h1>{value}</h1>
-            {f'<p>{subtitle}</p>' if subtitle else ''}
-        </div>
-        """
-        return card_html
+        return _CARD_TEMPLATE.format(
+            card_type=card_type,
+            title=title,
+            value=value,
+            subtitle_html=f'<p>{subtitle}</p>' if subtitle else ''
+        )
     
     @staticmethod
     def create_timer_display(time_value: float, label: str = ""):
         """Create animated timer display"""
-        timer_html = f"""
-        <div style="text-align: center; margin: 1rem 0;">
-            <div class="timer-display">{time_value:.1f}s</div>
-            {f'<p style="color: #666; margin-top: 0.5rem;">{label}</p>' if label else ''}
-        </div>
-        """
-        return timer_html
+        return _TIMER_TEMPLATE.format(
+            time_value=time_value,
+            label_html=f'<p style="color: #666; margin-top: 0.5rem;">{label}</p>' if label else ''
+        )
     
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def create_status_badge(text: str, status_type: str = "info"):
         """Create status badge"""
-        colors = {
-            'success': '#4CAF50',
-            'warning': '#FF9800',
-            'error': '#F44336',
-            'info': '#2196F3'
-        }
-        color = colors.get(status_type, colors['info'])
-        
-        badge_html = f"""
-        <span style="
-            background: {color};
-            color: white;
-            padding: 0.3rem 0.8rem;
-            border-radius: 15px;
-            font-size: 0.85rem;
-            font-weight: 600;
-            display: inline-block;
-            margin: 0.2rem;
-        ">{text}</span>
-        """
-        return badge_html
+        color = _BADGE_COLORS.get(status_type, _BADGE_COLORS['info'])
+        return _BADGE_TEMPLATE.format(color=color, text=text)
     
     @staticmethod
     def create_recommendation_card(recommendation: Dict[str, str]):
         """Create AI recommendation card"""
-        icons = {
-            'success': '✅',
-            'warning': '⚠️',
-            'error': '🚨',
-            'info': '💡',
-            'optimization': '⚡'
-        }
-        
-        icon = icons.get(recommendation.get('type', 'info'), '💡')
-        
-        card_html = f"""
-        <div class="recommendation-card">
-            <h4>{icon} {recommendation.get('title', 'Recommendation')}</h4>
-            <p>{recommendation.get('message', '')}</p>
-        </div>
-        """
-        return card_html
+        icon = _RECOMMENDATION_ICONS.get(recommendation.get('type', 'info'), '💡')
+        return _RECOMMENDATION_TEMPLATE.format(
+            icon=icon,
+            title=recommendation.get('title', 'Recommendation'),
+            message=recommendation.get('message', '')
+        )
     
     @staticmethod
-    def create_speedup_gauge(speedup: float, max_value: float = 10.0):
-        """Create speedup gauge visualization"""
+    def _build_speedup_gauge(max_value: float):
+        """Build the static speedup gauge figure"""
+        # Plotly is imported on first use so CSS/markup helpers load fast
+        import plotly.graph_objects as go
+        
         fig = go.Figure(go.Indicator(
             mode="gauge+number+delta",
-            value=speedup,
+            value=1.0,
             domain={'x': [0, 1], 'y': [0, 1]},
             title={'text': "Speedup Factor", 'font': {'size': 20}},
             delta={'reference': 1},
@@ -219,12 +250,22 @@ class UIComponents:
         return fig
     
     @staticmethod
-    def create_performance_chart(metrics_history: List[Dict[str, Any]]):
-        """Create performance monitoring chart"""
-        if not metrics_history:
-            return None
+    def create_speedup_gauge(speedup: float, max_value: float = 10.0):
+        """Create speedup gauge visualization"""
+        # Built once per session; reruns only update the value
+        key = f"_speedup_gauge_{max_value}"
+        if key not in st.session_state:
+            st.session_state[key] = UIComponents._build_speedup_gauge(max_value)
         
-        df = pd.DataFrame(metrics_history)
+        fig = st.session_state[key]
+        fig.data[0].value = speedup
+        return fig
+    
+    @staticmethod
+    def _build_performance_chart():
+        """Build the performance chart layout with empty traces"""
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
         
         fig = make_subplots(
             rows=2, cols=2,
@@ -236,8 +277,8 @@ class UIComponents:
         # CPU Usage
         fig.add_trace(
             go.Scatter(
-                x=df.index, 
-                y=df['cpu_percent'], 
+                x=[], 
+                y=[], 
                 name='CPU %', 
                 line=dict(color='#FF6B6B', width=2)
             ),
@@ -247,8 +288,8 @@ class UIComponents:
         # Memory Usage
         fig.add_trace(
             go.Scatter(
-                x=df.index, 
-                y=df['memory_percent'], 
+                x=[], 
+                y=[], 
                 name='Memory %', 
                 line=dict(color='#4ECDC4', width=2)
             ),
@@ -256,18 +297,16 @@ class UIComponents:
         )
         
         # System Load
-        if 'cpu_percent' in df.columns and 'memory_percent' in df.columns:
-            system_load = df['cpu_percent'] + df['memory_percent']
-            fig.add_trace(
-                go.Scatter(
-                    x=df.index, 
-                    y=system_load, 
-                    name='System Load', 
-                    line=dict(color='#FFD93D', width=2),
-                    fill='tonexty'
-                ),
-                row=2, col=1
-            )
+        fig.add_trace(
+            go.Scatter(
+                x=[], 
+                y=[], 
+                name='System Load', 
+                line=dict(color='#FFD93D', width=2),
+                fill='tonexty'
+            ),
+            row=2, col=1
+        )
         
         fig.update_layout(
             height=500, 
@@ -280,9 +319,38 @@ class UIComponents:
         
         return fig
     
+    
+    @staticmethod
+    def create_performance_chart(cpu_history: np.ndarray, memory_history: np.ndarray, min_points: int = 5):
+        """Create performance monitoring chart, or None until min_points samples exist"""
+        if len(cpu_history) < min_points:
+            return None
+        
+        # Built once per session; reruns only swap in the new series
+        if '_performance_chart' not in st.session_state:
+            st.session_state._performance_chart = UIComponents._build_performance_chart()
+        
+        fig = st.session_state._performance_chart
+        
+        # Skip the trace update when the series are identical to the last render
+        key = hash((cpu_history.tobytes(), memory_history.tobytes()))
+        if st.session_state.get('_performance_chart_key') == key:
+            return fig
+        st.session_state._performance_chart_key = key
+        
+        x = np.arange(len(cpu_history))
+        with fig.batch_update():
+            fig.data[0].x, fig.data[0].y = x, cpu_history
+            fig.data[1].x, fig.data[1].y = x, memory_history
+            fig.data[2].x, fig.data[2].y = x, cpu_history + memory_history
+        
+        return fig
+    
     @staticmethod
     def create_processing_comparison_chart(sequential_time: float, parallel_time: float, workers: int):
         """Create before/after comparison chart"""
+        import plotly.graph_objects as go
+        
         categories = ['Sequential', 'Parallel']
         times = [sequential_time, parallel_time]
         colors = ['#FF6B6B', '#4CAF50']
@@ -6,9 +6,222 @@ Handles video segmentation, processing, and merging operations
 import cv2
 import numpy as np
 import os
+import glob
 import time
-from multiprocessing import Pool, freeze_support
-from typing import List, Tuple, Dict, Any
+import shutil
+import tempfile
+import queue
+import functools
+import threading
+import subprocess
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Tuple, Dict, Any, Optional
+
+
+# Filters expressed as FFmpeg filter graphs, applied to the decoder's YUV frames
+FFMPEG_FILTERS = {
+    'grayscale': 'hue=s=0',
+    'blur': 'gblur=sigma=1',
+    'brightness': 'eq=brightness=0.1:contrast=1.3',
+    'contrast': 'eq=contrast=1.5'
+}
+
+# Linear filters as (alpha, beta) for convertScaleAbs
+SCALE_FILTERS = {
+    'brightness': (1.3, 20),
+    'contrast': (1.5, 0)
+}
+
+# 5-tap Gaussian (sigma derived from size) applied as two separable 1D passes
+GAUSSIAN_KERNEL_5 = cv2.getGaussianKernel(5, 0, ktype=cv2.CV_32F)
+
+# Upper bound on the frame batch held in memory per worker for linear filters
+FRAME_BATCH_BYTES = 32 * 1024 * 1024
+
+# OpenCV writer options that move its H.264 encodes onto NVENC
+NVENC_WRITER_OPTIONS = "video_codec;h264_nvenc|preset;p4|tune;ll"
+
+# Frames decoded ahead of the filter/encode loop (bounds memory at N frames)
+FRAME_QUEUE_SIZE = 8
+
+# Single background thread that deletes finished temp files off the UI thread;
+# one worker keeps the unlinks serialized in submission order
+_cleanup_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cleanup")
+
+
+def _grayscale_into(frame: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Convert a BGR frame to a single luma plane in dst"""
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=dst)
+
+
+def _blur_into(frame: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Gaussian-blur a BGR frame into dst"""
+    return cv2.sepFilter2D(frame, -1, GAUSSIAN_KERNEL_5, GAUSSIAN_KERNEL_5, dst=dst)
+
+
+def _passthrough(frame: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Return the frame unchanged"""
+    return frame
+
+
+# Per-frame filters as (function(frame, dst), output channels)
+FRAME_FILTERS = {
+    'grayscale': (_grayscale_into, 1),
+    'blur': (_blur_into, 3)
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_encoders(ffmpeg: str) -> str:
+    """List the encoders the ffmpeg build ships (empty if it cannot be run)"""
+    try:
+        result = subprocess.run([ffmpeg, '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return result.stdout
+
+
+@functools.lru_cache(maxsize=None)
+def _nvenc_available(ffmpeg: str) -> bool:
+    """Check once with a real encode that h264_nvenc works; builds list it without a GPU"""
+    if 'h264_nvenc' not in _ffmpeg_encoders(ffmpeg):
+        return False
+    try:
+        result = subprocess.run([ffmpeg, '-hide_banner', '-loglevel', 'error',
+                                 '-f', 'lavfi', '-i', 'color=s=256x256', '-frames:v', '1',
+                                 '-c:v', 'h264_nvenc', '-f', 'null', '-'],
+                                capture_output=True, timeout=20)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0
+
+
+# Result of the H.264 writer probe; pool workers inherit it via init_worker
+_h264_writer = None
+
+
+def _probe_h264_writer() -> bool:
+    """Open a throwaway avc1 writer to see whether OpenCV's FFmpeg backend can encode H.264"""
+    fd, probe_path = tempfile.mkstemp(suffix='.mp4')
+    os.close(fd)
+    try:
+        writer = cv2.VideoWriter(probe_path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*'avc1'), 30.0, (64, 64))
+        opened = writer.isOpened()
+        writer.release()
+    finally:
+        os.remove(probe_path)
+    return opened
+
+
+def _h264_writer_available() -> bool:
+    """Probe once per process whether OpenCV's FFmpeg backend can encode H.264"""
+    global _h264_writer
+    if _h264_writer is None:
+        _h264_writer = _probe_h264_writer()
+    return _h264_writer
+
+
+@functools.lru_cache(maxsize=None)
+def _route_writer_to_nvenc():
+    """Point OpenCV's H.264 writer at NVENC, keeping the override only if the writer still opens"""
+    global _h264_writer
+    if "OPENCV_FFMPEG_WRITER_OPTIONS" in os.environ:
+        return
+    
+    os.environ["OPENCV_FFMPEG_WRITER_OPTIONS"] = NVENC_WRITER_OPTIONS
+    _h264_writer = _probe_h264_writer()
+    if not _h264_writer:
+        # OpenCV's bundled FFmpeg may lack NVENC even when the system one has it
+        del os.environ["OPENCV_FFMPEG_WRITER_OPTIONS"]
+        _h264_writer = None
+
+
+def init_worker(h264_writer: bool, opencv_threads: int):
+    """Pool initializer: reuse the parent's codec probe and size OpenCV's thread pool"""
+    global _h264_writer
+    _h264_writer = h264_writer
+    cv2.setNumThreads(opencv_threads)
+
+
+def threads_per_worker(workers: int) -> int:
+    """Share of the cores each of `workers` concurrent segment jobs may use"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def worker_init_args(workers: int) -> Tuple[bool, int]:
+    """Arguments for init_worker, splitting the cores between the workers"""
+    return _h264_writer_available(), threads_per_worker(workers)
+
+
+def _open_writer(path: str, fps: float, size: Tuple[int, int], is_color: bool = True) -> cv2.VideoWriter:
+    """Open an H.264 writer, falling back to mp4v when no H.264 encoder is available"""
+    if _h264_writer_available():
+        writer = cv2.VideoWriter(path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*'avc1'), fps, size, is_color)
+        if writer.isOpened():
+            return writer
+        writer.release()
+    return cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size, is_color)
+
+
+def _decode_ahead(cap, maxsize: int = FRAME_QUEUE_SIZE):
+    """Yield frames from cap while a background thread decodes the next ones"""
+    frames = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    error = []
+    
+    def reader():
+        try:
+            while not stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames.put(frame)
+        except Exception as e:
+            error.append(e)
+        finally:
+            # The consumer blocks on the queue, so the sentinel must always land
+            frames.put(None)
+    
+    # OpenCV releases the GIL while decoding, so reads overlap the encoder
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+            yield frame
+        if error:
+            raise error[0]
+    finally:
+        # Unblock a reader stuck on a full queue before the capture is released
+        stop.set()
+        while thread.is_alive():
+            try:
+                frames.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def _stream_signature(segment: str) -> Tuple[int, int, int, float]:
+    """Codec fourcc, size and fps of a segment's video stream"""
+    cap = cv2.VideoCapture(segment)
+    signature = (int(cap.get(cv2.CAP_PROP_FOURCC)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                 int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), round(cap.get(cv2.CAP_PROP_FPS), 2))
+    cap.release()
+    return signature
+
+
+def _append_segment(out: cv2.VideoWriter, segment: str) -> int:
+    """Re-encode every frame of a segment onto an open writer"""
+    cap = cv2.VideoCapture(segment)
+    frame_count = 0
+    for frame in _decode_ahead(cap):
+        out.write(frame)
+        frame_count += 1
+    cap.release()
+    return frame_count
 
 
 class VideoProcessor:
@@ -17,14 +230,36 @@ class VideoProcessor:
     def __init__(self, segment_duration: float = 10.0):
         self.segment_duration = segment_duration
         self.temp_dir = "temp_processing"
+        
+        # Thread cap for each ffmpeg segment job; 0 leaves ffmpeg's default of
+        # roughly all cores, which oversubscribes when segments run in parallel
+        self.encoder_threads = 0
         self.output_dir = "output"
         
+        # Known filters run inside ffmpeg's filter graph when it can encode
+        # H.264 (on the GPU with NVENC, else libx264); OpenCV otherwise
+        self.ffmpeg = shutil.which("ffmpeg")
+        encoders = _ffmpeg_encoders(self.ffmpeg) if self.ffmpeg else ""
+        self.use_nvenc = bool(self.ffmpeg) and _nvenc_available(self.ffmpeg)
+        self.use_libx264 = 'libx264' in encoders
+        if self.use_nvenc:
+            # Route OpenCV's own H.264 writes to NVENC as well
+            _route_writer_to_nvenc()
+        
         # Ensure directories exist
         os.makedirs(self.temp_dir, exist_ok=True)
         os.makedirs(self.output_dir, exist_ok=True)
     
     def get_video_info(self, video_path: str) -> Dict[str, Any]:
         """Extract video metadata using OpenCV"""
+        # One stat up front; missing or empty files never reach the decoder
+        try:
+            file_size = os.stat(video_path).st_size
+        except OSError:
+            return None
+        if not file_size:
+            return None
+        
         cap = cv2.VideoCapture(video_path)
         
         if not cap.isOpened():
@@ -44,9 +279,30 @@ class VideoProcessor:
             'width': width,
             'height': height,
             'duration': duration,
-            'file_size': os.path.getsize(video_path) if os.path.exists(video_path) else 0
+            'file_size': file_size
         }
     
+    def _split_video_copy(self, video_path: str, segment_dir: str) -> Optional[List[str]]:
+        """Cut the video at keyframes with ffmpeg's segment muxer, without re-encoding"""
+        # Only the video stream is kept; audio is dropped downstream and data
+        # tracks (e.g. phone metadata) make the mp4 segment muxer fail
+        pattern = os.path.join(segment_dir, "segment_*.mp4")
+        cmd = [
+            self.ffmpeg, '-y', '-loglevel', 'error', '-i', video_path,
+            '-c', 'copy', '-map', '0:v', '-f', 'segment',
+            '-segment_time', str(self.segment_duration), '-reset_timestamps', '1',
+            os.path.join(segment_dir, "segment_%03d.mp4")
+        ]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Warning: Stream-copy split failed, re-encoding segments: {e}")
+            # Partial output would be mistaken for the re-encoded segments
+            self.cleanup_temp_files(glob.glob(pattern))
+            return None
+        
+        return sorted(glob.glob(pattern))
+    
     def split_video(self, video_path: str) -> Tuple[List[str], float]:
         """Split video into segments for parallel processing - optimized for speed"""
         cap = cv2.VideoCapture(video_path)
@@ -56,41 +312,54 @@ class VideoProcessor:
         
         fps = cap.get(cv2.CAP_PROP_FPS)
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
         duration = total_frames / fps
         
         print(f"Video info: {duration:.1f}s, {total_frames} frames, {fps:.1f} FPS")
         
+        # temp_dir is shared by every session, so each split gets its own
+        # directory; cleanup_temp_files removes it with the last segment
+        segment_dir = tempfile.mkdtemp(prefix="split_", dir=self.temp_dir)
+        
+        if self.ffmpeg:
+            segments = self._split_video_copy(video_path, segment_dir)
+            if segments:
+                cap.release()
+                print(f"Successfully created {len(segments)} segments (stream copy)")
+                return segments, duration
+        
         segments = []
         segment_count = int(np.ceil(duration / self.segment_duration))
         frames_per_segment = int(fps * self.segment_duration)
         
-        # Use mp4v codec for better compatibility
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        # Segments are contiguous, so the capture is read straight through
+        # instead of seeking; current_frame is the next frame it will return
+        current_frame = 0
         
         for i in range(segment_count):
             start_frame = i * frames_per_segment
             end_frame = min((i + 1) * frames_per_segment, total_frames)
             
-            segment_file = os.path.join(self.temp_dir, f"segment_{i:03d}.mp4")
+            segment_file = os.path.join(segment_dir, f"segment_{i:03d}.mp4")
             
             # Create video writer for this segment
-            out = cv2.VideoWriter(
-                segment_file, fourcc, fps, 
-                (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 
-                 int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
-            )
+            out = _open_writer(segment_file, fps, frame_size)
             
             if not out.isOpened():
                 print(f"Error: Cannot create segment file {segment_file}")
                 continue
             
-            # Set to start frame
-            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            # Skip frames left over from a failed segment without converting them
+            while current_frame < start_frame and cap.grab():
+                current_frame += 1
             
             # Write frames for this segment
             frames_written = 0
             for frame_idx in range(start_frame, end_frame):
-                ret, frame = cap.read()
+                if not cap.grab():
+                    break
+                current_frame += 1
+                ret, frame = cap.retrieve()
                 if not ret:
                     break
                 
@@ -111,6 +380,8 @@ class VideoProcessor:
                 print(f"Failed to create segment {i}")
         
         cap.release()
+        if not segments:
+            shutil.rmtree(segment_dir, ignore_errors=True)
         print(f"Successfully created {len(segments)} segments")
         return segments, duration
     
@@ -119,19 +390,71 @@ class VideoProcessor:
         if filter_type == "grayscale":
             # Fast grayscale conversion
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+            return cv2.merge((gray, gray, gray))
         elif filter_type == "blur":
             # Light blur for speed
-            return cv2.GaussianBlur(frame, (5, 5), 0)
-        elif filter_type == "brightness":
-            # Fast brightness adjustment
-            return cv2.convertScaleAbs(frame, alpha=1.3, beta=20)
-        elif filter_type == "contrast":
-            # Fast contrast adjustment
-            return cv2.convertScaleAbs(frame, alpha=1.5, beta=0)
+            return cv2.sepFilter2D(frame, -1, GAUSSIAN_KERNEL_5, GAUSSIAN_KERNEL_5)
+        elif filter_type in SCALE_FILTERS:
+            # Fast brightness/contrast adjustment
+            alpha, beta = SCALE_FILTERS[filter_type]
+            return cv2.convertScaleAbs(frame, alpha=alpha, beta=beta)
         else:
             return frame
     
+    def _process_segment_ffmpeg(self, input_file: str, output_file: str, filter_type: str) -> bool:
+        """Decode, filter and encode a segment in one ffmpeg command, in YUV throughout"""
+        if self.use_nvenc:
+            decode = ['-hwaccel', 'cuda']
+            encode = ['-c:v', 'h264_nvenc', '-preset', 'p4']
+        else:
+            decode = []
+            encode = ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23']
+        
+        threads = []
+        if self.encoder_threads:
+            threads = ['-filter_threads', str(self.encoder_threads), '-threads', str(self.encoder_threads)]
+        
+        cmd = [
+            self.ffmpeg, '-y', '-loglevel', 'error', *decode, '-i', input_file,
+            '-vf', FFMPEG_FILTERS[filter_type],
+            '-an', *encode, *threads, '-pix_fmt', 'yuv420p',
+            output_file
+        ]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Warning: ffmpeg filter pipeline failed for {input_file}, using OpenCV: {e}")
+            return False
+        
+        return os.path.exists(output_file) and os.path.getsize(output_file) > 1000
+    
+    def _write_scaled_batches(self, cap, out, width: int, height: int, alpha: float, beta: float) -> int:
+        """Adjust frames in batches as one (N*H, W, 3) slab, reusing the buffers"""
+        batch = max(1, FRAME_BATCH_BYTES // (width * height * 3))
+        frames = np.empty((batch, height, width, 3), dtype=np.uint8)
+        adjusted = np.empty_like(frames)
+        written = 0
+        
+        while True:
+            n = 0
+            while n < batch:
+                ret, frame = cap.read(frames[n])
+                if not ret:
+                    break
+                if frame.ctypes.data != frames[n].ctypes.data:
+                    frames[n] = frame
+                n += 1
+            
+            if n:
+                cv2.convertScaleAbs(frames[:n].reshape(-1, width, 3), dst=adjusted[:n].reshape(-1, width, 3),
+                                    alpha=alpha, beta=beta)
+                for frame in adjusted[:n]:
+                    out.write(frame)
+                written += n
+            
+            if n < batch:
+                return written
+    
     def process_segment(self, args: Tuple) -> str:
         """Process a single video segment with specified filter - optimized"""
         segment_id, input_file, output_file, filter_type = args
@@ -140,6 +463,11 @@ class VideoProcessor:
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_file), exist_ok=True)
             
+            if ((self.use_nvenc or self.use_libx264) and filter_type in FFMPEG_FILTERS
+                    and self._process_segment_ffmpeg(input_file, output_file, filter_type)):
+                print(f"Successfully processed segment {segment_id} with ffmpeg")
+                return output_file
+            
             cap = cv2.VideoCapture(input_file)
             if not cap.isOpened():
                 print(f"Error: Cannot open input file {input_file}")
@@ -154,39 +482,31 @@ class VideoProcessor:
                 cap.release()
                 return None
             
-            # Use mp4v codec for better compatibility
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_file, fourcc, fps, (width, height))
+            # Grayscale frames go to the encoder as a single plane, which it
+            # promotes to YUV itself, so no BGR copy is ever built
+            out = _open_writer(output_file, fps, (width, height), is_color=filter_type != "grayscale")
             
             if not out.isOpened():
                 print(f"Error: Cannot create output file {output_file}")
                 cap.release()
                 return None
             
-            frame_count = 0
-            processed_frames = 0
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+            if filter_type in SCALE_FILTERS:
+                alpha, beta = SCALE_FILTERS[filter_type]
+                processed_frames = self._write_scaled_batches(cap, out, width, height, alpha, beta)
+            else:
+                processed_frames = 0
                 
-                # Apply filter - simplified for reliability
-                if filter_type == "grayscale":
-                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    processed_frame = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
-                elif filter_type == "blur":
-                    processed_frame = cv2.GaussianBlur(frame, (5, 5), 0)
-                elif filter_type == "brightness":
-                    processed_frame = cv2.convertScaleAbs(frame, alpha=1.3, beta=20)
-                elif filter_type == "contrast":
-                    processed_frame = cv2.convertScaleAbs(frame, alpha=1.5, beta=0)
-                else:
-                    processed_frame = frame
+                # Resolve the filter once; its output buffer is reused for every frame
+                apply, channels = FRAME_FILTERS.get(filter_type, (_passthrough, 3))
+                shape = (height, width) if channels == 1 else (height, width, channels)
+                dst = np.empty(shape, dtype=np.uint8)
+                write = out.write
                 
-                out.write(processed_frame)
-                frame_count += 1
-                processed_frames += 1
+                for frame in _decode_ahead(cap):
+                    dst = apply(frame, dst)
+                    write(dst)
+                    processed_frames += 1
             
             cap.release()
             out.release()
@@ -226,21 +546,56 @@ class VideoProcessor:
             output_file = os.path.join(self.output_dir, f"par_{i:03d}.mp4")
             tasks.append((i, segment, output_file, filter_type))
         
-        # Process in parallel
-        freeze_support()
-        with Pool(workers) as pool:
-            processed_segments = pool.map(self.process_segment, tasks)
+        # Workers pull the next segment as soon as they finish, so one slow
+        # segment does not hold back the rest; results keep segment order
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=worker_init_args(workers)) as executor:
+            futures = [executor.submit(self.process_segment, task) for task in tasks]
+            processed_segments = [future.result() for future in futures]
         
         processing_time = time.time() - start_time
         return processed_segments, processing_time
     
-    def merge_segments(self, segments: List[str], output_path: str) -> str:
-        """Merge processed segments into final video - optimized"""
+    def _merge_segments_copy(self, segments: List[str], output_path: str) -> bool:
+        """Concatenate segments with ffmpeg's concat demuxer, without re-encoding"""
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', dir=self.temp_dir, delete=False) as f:
+            for segment in segments:
+                escaped = os.path.abspath(segment).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+            list_file = f.name
+        
+        cmd = [
+            self.ffmpeg, '-y', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', list_file,
+            '-c', 'copy', output_path
+        ]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Warning: Stream-copy merge failed, re-encoding segments: {e}")
+            return False
+        finally:
+            os.remove(list_file)
+        
+        return os.path.exists(output_path) and os.path.getsize(output_path) > 1000
+    
+    def merge_segments(self, segments: List[str], output_path: str) -> Optional[str]:
+        """Merge processed segments into final video, returning None on failure"""
         valid_segments = [s for s in segments if s and os.path.exists(s)]
         
         if not valid_segments:
             raise ValueError("No valid segments to merge")
         
+        # Stream copy only works when every segment came out of the same
+        # encoder; a segment whose ffmpeg run failed was written by OpenCV, and
+        # concatenating mixed codecs "succeeds" with a corrupt file
+        if self.ffmpeg:
+            if len({_stream_signature(s) for s in valid_segments}) == 1:
+                if self._merge_segments_copy(valid_segments, output_path):
+                    return output_path
+            else:
+                print("Warning: Segments differ in codec or size, re-encoding the merge")
+        
         # Get video properties from first segment
         cap = cv2.VideoCapture(valid_segments[0])
         fps = cap.get(cv2.CAP_PROP_FPS)
@@ -248,32 +603,47 @@ class VideoProcessor:
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         cap.release()
         
-        # Use mp4v for final output
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+        out = _open_writer(output_path, fps, (width, height))
+        
+        if not out.isOpened():
+            print(f"Error: Cannot create output file {output_path}")
+            return None
         
         for segment in valid_segments:
-            cap = cv2.VideoCapture(segment)
-            frame_count = 0
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                out.write(frame)
-                frame_count += 1
-            cap.release()
+            _append_segment(out, segment)
         
         out.release()
-        return output_path
+        
+        # Callers rely on a truthy result meaning the file is usable
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 1000:
+            return output_path
+        print(f"Error: Merged file {output_path} is invalid or too small")
+        return None
     
     def cleanup_temp_files(self, files: List[str]):
         """Clean up temporary files"""
         for file_path in files:
+            if not file_path:
+                continue
             try:
-                if file_path and os.path.exists(file_path):
-                    os.remove(file_path)
+                os.unlink(file_path)
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 print(f"Warning: Could not remove temp file {file_path}: {e}")
+        
+        # Per-split segment directories go once their last file is removed
+        temp_root = os.path.abspath(self.temp_dir)
+        for directory in {os.path.dirname(os.path.abspath(f)) for f in files if f}:
+            if os.path.dirname(directory) == temp_root:
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    pass
+    
+    def cleanup_temp_files_async(self, files: List[str]) -> Future:
+        """Clean up temporary files on the background cleanup thread"""
+        return _cleanup_pool.submit(self.cleanup_temp_files, list(files))
     
     def process_video_direct(self, input_path: str, output_path: str, filter_type: str) -> str:
         """Process entire video directly without segmentation - for demo mode"""
@@ -286,23 +656,25 @@ class VideoProcessor:
             width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             
-            # Use mp4v codec for compatibility
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+            out = _open_writer(output_path, fps, (width, height))
             
             if not out.isOpened():
                 raise ValueError(f"Cannot create output file: {output_path}")
             
-            frame_count = 0
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Apply filter
-                processed_frame = self.apply_filter(frame, filter_type)
-                out.write(processed_frame)
-                frame_count += 1
+            if filter_type in SCALE_FILTERS:
+                alpha, beta = SCALE_FILTERS[filter_type]
+                frame_count = self._write_scaled_batches(cap, out, width, height, alpha, beta)
+            else:
+                frame_count = 0
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    
+                    # Apply filter
+                    processed_frame = self.apply_filter(frame, filter_type)
+                    out.write(processed_frame)
+                    frame_count += 1
             
             cap.release()
             out.release()
@@ -315,4 +687,81 @@ class VideoProcessor:
                 
         except Exception as e:
             print(f"Error in direct video processing: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+class SegmentMerger:
+    """Merge segments in order as they finish, re-encoding on a writer thread without ffmpeg"""
+    
+    def __init__(self, processor: VideoProcessor, output_path: str):
+        self.processor = processor
+        self.output_path = output_path
+        
+        self._ready = {}
+        self._next = 0
+        self._segments = []
+        self._out = None
+        
+        # Without ffmpeg, segments are re-encoded on a writer thread fed in
+        # order by add(), so the caller's drain loop never waits on encoding
+        self._queue = queue.Queue()
+        self._writer = None
+    
+    def add(self, index: int, segment: Optional[str]):
+        """Record a finished segment and append any contiguous run now complete"""
+        self._ready[index] = segment
+        while self._next in self._ready:
+            segment = self._ready.pop(self._next)
+            self._next += 1
+            if not segment or not os.path.exists(segment):
+                continue
+            
+            self._segments.append(segment)
+            
+            # ffmpeg concatenates by stream copy at the end, which is cheaper
+            # than re-encoding incrementally
+            if not self.processor.ffmpeg:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="segment-merger", daemon=True)
+                    self._writer.start()
+                self._queue.put(segment)
+    
+    def _write_loop(self):
+        """Writer thread: append queued segments in order until close() sends None"""
+        for segment in iter(self._queue.get, None):
+            try:
+                self._append(segment)
+            except Exception as e:
+                print(f"Error merging segment {segment}: {e}")
+    
+    def _append(self, segment: str):
+        """Re-encode a segment onto the output, opening it on first use"""
+        if self._out is None:
+            cap = cv2.VideoCapture(segment)
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            cap.release()
+            self._out = _open_writer(self.output_path, fps, size)
+        
+        if self._out.isOpened():
+            _append_segment(self._out, segment)
+    
+    def close(self) -> Optional[str]:
+        """Finish the merge, returning the output path or None on failure"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+        
+        if self._out is None:
+            return self.processor.merge_segments(self._segments, self.output_path)
+        
+        opened = self._out.isOpened()
+        self._out.release()
+        
+        if not opened:
+            print(f"Error: Cannot create output file {self.output_path}")
+            return None
+        if os.path.exists(self.output_path) and os.path.getsize(self.output_path) > 1000:
+            return self.output_path
+        print(f"Error: Merged file {self.output_path} is invalid or too small")
+        return None
@@ -11,14 +11,16 @@ Created: February 2026
 
 import streamlit as st
 import os
+import shutil
 import time
 import json
 from datetime import datetime
-from multiprocessing import Pool, freeze_support
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import local modules
-from src.video_processor import VideoProcessor
-from src.ai_optimizer import AIOptimizer
+from src.video_processor import VideoProcessor, SegmentMerger, threads_per_worker
+from src.ai_optimizer import get_optimizer
 from src.performance_monitor import PerformanceMonitor
 from src.ui_components import UIComponents
 
@@ -30,17 +32,130 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Chunk size for persisting uploads to disk
+UPLOAD_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Static markup for the real-time metric grid; only the numbers change per rerun
+_METRICS_TEMPLATE = """
+<div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; margin: 1rem 0;">
+    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
+        <h4>💻 CPU Usage</h4>
+        <h2>{cpu:.1f}%</h2>
+        <p>{cores} cores</p>
+    </div>
+    <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
+        <h4>🧠 Memory Usage</h4>
+        <h2>{mem:.1f}%</h2>
+        <p>{free:.1f} GB free</p>
+    </div>
+    <div style="background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
+        <h4>💾 Disk Usage</h4>
+        <h2>{disk:.1f}%</h2>
+        <p>{used:.0f} GB used</p>
+    </div>
+</div>
+"""
+
 # Initialize session state
 if 'performance_monitor' not in st.session_state:
     st.session_state.performance_monitor = PerformanceMonitor()
     st.session_state.performance_monitor.start_monitoring()
 
 if 'ai_optimizer' not in st.session_state:
-    st.session_state.ai_optimizer = AIOptimizer()
+    st.session_state.ai_optimizer = get_optimizer()
 
 if 'video_processor' not in st.session_state:
     st.session_state.video_processor = VideoProcessor()
 
+# Working directories are created once per session, not per rerun or segment
+if 'dirs_ready' not in st.session_state:
+    os.makedirs("output", exist_ok=True)
+    os.makedirs("uploads", exist_ok=True)
+    st.session_state.dirs_ready = True
+
+
+def get_worker_pool(workers: int) -> ThreadPoolExecutor:
+    """Return the session's persistent worker pool, resizing it if needed"""
+    pool = st.session_state.get('worker_pool')
+    if pool is not None and st.session_state.get('worker_pool_size') == workers:
+        return pool
+    
+    if pool is not None:
+        pool.shutdown(wait=False)
+    
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="segment")
+    st.session_state.worker_pool = pool
+    st.session_state.worker_pool_size = workers
+    return pool
+
+
+def process_segments(video_processor: VideoProcessor, tasks: list, workers: int, progress,
+                     on_result=None) -> list:
+    """Run segment tasks on the worker pool, advancing progress as each one completes"""
+    executor = get_worker_pool(workers)
+    futures = {executor.submit(video_processor.process_segment, task): i for i, task in enumerate(tasks)}
+    
+    # Completions are drained as they land; results keep segment order
+    results = [None] * len(tasks)
+    for completed, future in enumerate(as_completed(futures), start=1):
+        index = futures[future]
+        results[index] = future.result()
+        progress.progress(completed / len(tasks))
+        if on_result:
+            on_result(index, results[index])
+    return results
+
+
+@st.cache_data(show_spinner=False)
+def cached_video_info(_processor: VideoProcessor, video_path: str, mtime: float, size: int):
+    """Video metadata cached on path, mtime and size so reruns skip re-opening the file"""
+    return _processor.get_video_info(video_path)
+
+
+def render_live_metrics(monitor: PerformanceMonitor):
+    """Current system status and history chart, rerun on its own when live"""
+    current_metrics = monitor.get_current_metrics()
+    cpu_history, memory_history = monitor.get_cpu_mem_arrays()
+    
+    # Always show current metrics
+    st.markdown("### 📈 Current System Status")
+    
+    # Create real-time metric display. Streamlit drops elements a rerun does
+    # not re-emit, so the block is always sent, but its markup is only rebuilt
+    # once a reading moves by a whole percent and identical markup is not
+    # re-rendered by the browser
+    metrics_key = (round(current_metrics['cpu_percent']),
+                   round(current_metrics['memory_percent']),
+                   round(current_metrics['disk_percent']))
+    if st.session_state.get('last_metrics_key') != metrics_key:
+        st.session_state.last_metrics_key = metrics_key
+        st.session_state.current_metrics_html = _METRICS_TEMPLATE.format(
+            cpu=current_metrics['cpu_percent'],
+            cores=current_metrics['cpu_count'],
+            mem=current_metrics['memory_percent'],
+            free=current_metrics['memory_available_gb'],
+            disk=current_metrics['disk_percent'],
+            used=current_metrics['disk_used_gb']
+        )
+    st.markdown(st.session_state.current_metrics_html, unsafe_allow_html=True)
+    
+    # System health indicator
+    cpu_health = "🟢 Good" if current_metrics['cpu_percent'] < 70 else "🟡 High" if current_metrics['cpu_percent'] < 90 else "🔴 Critical"
+    memory_health = "🟢 Good" if current_metrics['memory_percent'] < 70 else "🟡 High" if current_metrics['memory_percent'] < 90 else "🔴 Critical"
+    
+    st.markdown(f"""
+    **System Health**: CPU: {cpu_health} | Memory: {memory_health} | 
+    Last updated: {time.strftime('%H:%M:%S')}
+    """)
+    
+    # Show historical chart once enough samples exist
+    perf_chart = UIComponents.create_performance_chart(cpu_history, memory_history)
+    if perf_chart:
+        st.markdown("### 📊 Performance History")
+        st.plotly_chart(perf_chart, use_container_width=True)
+    else:
+        st.info("📊 Historical data will appear after a few monitoring cycles...")
+
 
 def main():
     """Main application function"""
@@ -70,35 +185,40 @@ def main():
         
         # System status
         st.markdown("### 📊 System Status")
-        st.metric("CPU", f"{current_metrics['cpu_percent']:.1f}%")
-        st.metric("Memory", f"{current_metrics['memory_percent']:.1f}%")
+        cpu_col, mem_col = st.columns(2)
+        cpu_col.metric("CPU", f"{current_metrics['cpu_percent']:.1f}%")
+        mem_col.metric("Memory", f"{current_metrics['memory_percent']:.1f}%")
         
         # Configuration
         st.markdown("### 🔧 Processing Settings")
         
-        workers = st.slider(
-            "🔧 Parallel Workers",
-            min_value=1,
-            max_value=4,  # Limited for cloud deployment
-            value=2,
-            help="Number of parallel workers (limited to 4 on cloud)"
-        )
-        
-        segment_duration = st.slider(
-            "⏱️ Segment Duration (seconds)",
-            min_value=5.0,
-            max_value=15.0,  # Shorter segments for cloud
-            value=10.0,
-            step=1.0,
-            help="Duration of each video segment"
-        )
-        
-        filter_type = st.selectbox(
-            "🎨 Video Filter",
-            options=["grayscale", "brightness", "blur", "contrast", "none"],
-            index=0,
-            help="Select the filter to apply to the video"
-        )
+        # Settings only apply on submit, so dragging a slider does not rerun the page
+        with st.form("processing_settings"):
+            workers = st.slider(
+                "🔧 Parallel Workers",
+                min_value=1,
+                max_value=4,  # Limited for cloud deployment
+                value=2,
+                help="Number of parallel workers (limited to 4 on cloud)"
+            )
+            
+            segment_duration = st.slider(
+                "⏱️ Segment Duration (seconds)",
+                min_value=5.0,
+                max_value=15.0,  # Shorter segments for cloud
+                value=10.0,
+                step=1.0,
+                help="Duration of each video segment"
+            )
+            
+            filter_type = st.selectbox(
+                "🎨 Video Filter",
+                options=["grayscale", "brightness", "blur", "contrast", "none"],
+                index=0,
+                help="Select the filter to apply to the video"
+            )
+            
+            st.form_submit_button("✅ Apply Settings", use_container_width=True)
         
         # Cloud limitations notice
         st.warning("⚠️ **Cloud Limitations:**\n- Max 4 workers\n- Shorter processing time\n- Limited file size")
@@ -115,14 +235,11 @@ def main():
         st.session_state.enable_realtime = enable_realtime
         
         if st.button("📈 Export Performance Report"):
-            filename = monitor.export_metrics()
-            with open(filename, 'r') as f:
-                report_data = f.read()
-            
+            # The report goes straight to the browser; nothing is written to disk
             st.download_button(
                 "📥 Download Report",
-                data=report_data,
-                file_name=filename,
+                data=monitor.export_metrics_bytes(),
+                file_name=f"performance_metrics_{int(time.time())}.json",
                 mime="application/json"
             )
     
@@ -137,35 +254,46 @@ def main():
     
     if uploaded_file is not None:
         # Check file size for cloud deployment
-        file_size_mb = len(uploaded_file.getvalue()) / (1024 * 1024)
+        file_size_mb = uploaded_file.size / (1024 * 1024)
         if file_size_mb > 200:
             st.error(f"❌ File too large ({file_size_mb:.1f}MB). Please upload a file smaller than 200MB.")
             return
         
-        # Save uploaded file
-        video_path = f"uploads/{uploaded_file.name}"
-        os.makedirs("uploads", exist_ok=True)
+        # Save uploaded file. uploads/ is shared by all sessions, so the path
+        # carries the upload's file_id: another video with the same name and
+        # size must not reuse this file or its cached analysis
+        video_path = f"uploads/{uploaded_file.file_id}_{uploaded_file.name}"
         
-        with open(video_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # Only write the upload once; reruns keep the same file and mtime
+        try:
+            saved = os.stat(video_path).st_size == uploaded_file.size
+        except FileNotFoundError:
+            saved = False
+        
+        if not saved:
+            uploaded_file.seek(0)
+            with open(video_path, "wb") as f:
+                shutil.copyfileobj(uploaded_file, f, length=UPLOAD_CHUNK_BYTES)
         
         # Analyze video
         with st.spinner("📊 Analyzing video..."):
-            video_info = video_processor.get_video_info(video_path)
-            
-            if video_info is None:
-                st.error("❌ Could not analyze video. Please try a different format.")
-                return
+            stat = os.stat(video_path)
+            video_info = cached_video_info(video_processor, video_path, stat.st_mtime, stat.st_size)
+        
+        if video_info is None:
+            st.error("❌ Could not analyze video. Please try a different format.")
+            return
         
         # Display video information
         st.success(f"✅ Video analyzed: {uploaded_file.name} ({file_size_mb:.1f}MB)")
         
-        # Video info metrics - display in rows to avoid nesting
-        st.metric("Duration", f"{video_info['duration']:.1f}s")
-        st.metric("Resolution", f"{video_info['width']}x{video_info['height']}")
-        st.metric("FPS", f"{video_info['fps']:.1f}")
+        # Video info metrics - one columns row, one layout pass
         segments = int(video_info['duration'] / segment_duration) + 1
-        st.metric("Segments", segments)
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Duration", f"{video_info['duration']:.1f}s")
+        c2.metric("Resolution", f"{video_info['width']}x{video_info['height']}")
+        c3.metric("FPS", f"{video_info['fps']:.1f}")
+        c4.metric("Segments", segments)
         
         # Processing buttons
         st.markdown("### 🚀 Start Processing")
@@ -225,9 +353,6 @@ def main():
     st.markdown("---")
     st.markdown("## 📊 Real-Time System Monitoring")
     
-    # Check if real-time monitoring is enabled
-    enable_realtime = st.session_state.get('enable_realtime', True)
-    
     # Add refresh controls
     col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
@@ -241,58 +366,12 @@ def main():
     with col3:
         auto_refresh = st.button("🔄 Auto-Refresh (3s)")
     
-    # Get current metrics and display
-    current_metrics = monitor.get_current_metrics()
-    metrics_history = monitor.get_metrics_history()
-    
-    # Always show current metrics
-    st.markdown("### 📈 Current System Status")
-    
-    # Create real-time metric display
-    current_metrics_html = f"""
-    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; margin: 1rem 0;">
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
-            <h4>💻 CPU Usage</h4>
-            <h2>{current_metrics['cpu_percent']:.1f}%</h2>
-            <p>{current_metrics['cpu_count']} cores</p>
-        </div>
-        <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
-            <h4>🧠 Memory Usage</h4>
-            <h2>{current_metrics['memory_percent']:.1f}%</h2>
-            <p>{current_metrics['memory_available_gb']:.1f} GB free</p>
-        </div>
-        <div style="background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%); padding: 1rem; border-radius: 10px; color: white; text-align: center;">
-            <h4>💾 Disk Usage</h4>
-            <h2>{current_metrics['disk_percent']:.1f}%</h2>
-            <p>{current_metrics['disk_used_gb']:.0f} GB used</p>
-        </div>
-    </div>
-    """
-    st.markdown(current_metrics_html, unsafe_allow_html=True)
-    
-    # System health indicator
-    cpu_health = "🟢 Good" if current_metrics['cpu_percent'] < 70 else "🟡 High" if current_metrics['cpu_percent'] < 90 else "🔴 Critical"
-    memory_health = "🟢 Good" if current_metrics['memory_percent'] < 70 else "🟡 High" if current_metrics['memory_percent'] < 90 else "🔴 Critical"
-    
-    st.markdown(f"""
-    **System Health**: CPU: {cpu_health} | Memory: {memory_health} | 
-    Last updated: {time.strftime('%H:%M:%S')}
-    """)
-    
-    # Show historical chart if available
-    if len(metrics_history) > 1:
-        st.markdown("### 📊 Performance History")
-        perf_chart = UIComponents.create_performance_chart(metrics_history)
-        if perf_chart:
-            st.plotly_chart(perf_chart, use_container_width=True)
-    else:
-        st.info("📊 Historical data will appear after a few monitoring cycles...")
-    
-    # Auto-refresh mechanism
+    # Live monitoring reruns only the status fragment every 3s, not the whole page
     if auto_refresh or (enable_realtime and 'auto_refresh_active' in st.session_state):
         st.session_state.auto_refresh_active = True
-        time.sleep(3)
-        st.rerun()
+        st.fragment(run_every=3)(render_live_metrics)(monitor)
+    else:
+        render_live_metrics(monitor)
 
 
 def run_performance_comparison(video_path: str, filter_type: str, workers: int, segment_duration: float):
@@ -310,6 +389,8 @@ def run_performance_comparison(video_path: str, filter_type: str, workers: int,
         # Split video
         st.info("🎬 Splitting video into segments...")
         video_processor.segment_duration = segment_duration
+        # Both phases run each segment on one worker's share of the cores
+        video_processor.encoder_threads = threads_per_worker(workers)
         segments, duration = video_processor.split_video(video_path)
         
         if not segments:
@@ -322,14 +403,16 @@ def run_performance_comparison(video_path: str, filter_type: str, workers: int,
         st.markdown("## 🐢 Sequential Processing")
         seq_progress = st.progress(0)
         
+        # Output paths are prepared once, outside the timed loops
+        seq_paths = [f"output/seq_{i:03d}.mp4" for i in range(len(segments))]
+        par_paths = [f"output/par_{i:03d}.mp4" for i in range(len(segments))]
+        
         start_seq = time.time()
         processed_seq = []
         
         for i, segment in enumerate(segments):
             seq_progress.progress((i + 1) / len(segments))
-            output_file = f"output/seq_{i:03d}.mp4"
-            os.makedirs("output", exist_ok=True)
-            result = video_processor.process_segment((i, segment, output_file, filter_type))
+            result = video_processor.process_segment((i, segment, seq_paths[i], filter_type))
             if result:
                 processed_seq.append(result)
         
@@ -343,15 +426,17 @@ def run_performance_comparison(video_path: str, filter_type: str, workers: int,
         start_par = time.time()
         
         # Prepare tasks
-        par_tasks = []
-        for i, segment in enumerate(segments):
-            output_file = f"output/par_{i:03d}.mp4"
-            par_tasks.append((i, segment, output_file, filter_type))
+        par_tasks = [(i, segment, par_paths[i], filter_type) for i, segment in enumerate(segments)]
         
-        # Process in parallel
-        freeze_support()
-        with Pool(workers) as pool:
-            processed_par = pool.map(video_processor.process_segment, par_tasks)
+        # The final video is assembled from finished segments while the
+        # remaining ones are still being processed
+        timestamp = int(time.time())
+        final_output_path = f"output/final_processed_{timestamp}.mp4"
+        merger = SegmentMerger(video_processor, final_output_path)
+        
+        # Process in parallel; OpenCV and ffmpeg release the GIL, so threads
+        # share the session's processor without pickling or forking
+        processed_par = process_segments(video_processor, par_tasks, workers, par_progress, merger.add)
         
         processed_par = [p for p in processed_par if p is not None]
         parallel_time = time.time() - start_par
@@ -361,29 +446,24 @@ def run_performance_comparison(video_path: str, filter_type: str, workers: int,
         
         # Merge processed segments into final video
         st.info("🔄 Merging segments into final video...")
-        timestamp = int(time.time())
-        final_output_path = f"output/final_processed_{timestamp}.mp4"
         
         try:
-            merged_video_path = video_processor.merge_segments(processed_par, final_output_path)
+            merged_video_path = merger.close()
             
-            if merged_video_path and os.path.exists(merged_video_path):
+            if merged_video_path:
                 st.success("✅ Video processing complete!")
                 
-                # Provide download button
-                with open(merged_video_path, "rb") as file:
-                    video_bytes = file.read()
-                
+                # Provide download button; the file is only read when clicked
                 st.download_button(
                     label="📥 Download Processed Video",
-                    data=video_bytes,
+                    data=Path(merged_video_path).read_bytes,
                     file_name=f"renderrush_processed_{filter_type}_{timestamp}.mp4",
                     mime="video/mp4",
                     type="primary"
                 )
                 
                 # Show file info
-                file_size_mb = len(video_bytes) / (1024 * 1024)
+                file_size_mb = os.path.getsize(merged_video_path) / (1024 * 1024)
                 st.info(f"📁 File size: {file_size_mb:.1f}MB | Filter: {filter_type} | Workers: {workers}")
                 
             else:
@@ -424,10 +504,8 @@ def run_performance_comparison(video_path: str, filter_type: str, workers: int,
             
             st.balloons()
         
-        # Cleanup
-        video_processor.cleanup_temp_files(segments)
-        if os.path.exists(video_path):
-            os.remove(video_path)
+        # Cleanup runs in the background so results show without waiting on unlinks
+        video_processor.cleanup_temp_files_async(segments + [video_path])
             
     except Exception as e:
         st.error(f"Processing failed: {e}")
@@ -445,6 +523,8 @@ def run_parallel_processing(video_path: str, filter_type: str, workers: int, seg
         # Split video
         st.info("🎬 Splitting video into segments...")
         video_processor.segment_duration = segment_duration
+        # Both phases run each segment on one worker's share of the cores
+        video_processor.encoder_threads = threads_per_worker(workers)
         segments, duration = video_processor.split_video(video_path)
         
         if not segments:
@@ -460,16 +540,10 @@ def run_parallel_processing(video_path: str, filter_type: str, workers: int, seg
         start_time = time.time()
         
         # Prepare tasks
-        tasks = []
-        for i, segment in enumerate(segments):
-            output_file = f"output/par_{i:03d}.mp4"
-            os.makedirs("output", exist_ok=True)
-            tasks.append((i, segment, output_file, filter_type))
+        tasks = [(i, segment, f"output/par_{i:03d}.mp4", filter_type) for i, segment in enumerate(segments)]
         
         # Process in parallel
-        freeze_support()
-        with Pool(workers) as pool:
-            processed_segments = pool.map(video_processor.process_segment, tasks)
+        processed_segments = process_segments(video_processor, tasks, workers, progress_bar)
         
         processed_segments = [p for p in processed_segments if p is not None]
         processing_time = time.time() - start_time
@@ -485,23 +559,20 @@ def run_parallel_processing(video_path: str, filter_type: str, workers: int, seg
         try:
             merged_video_path = video_processor.merge_segments(processed_segments, final_output_path)
             
-            if merged_video_path and os.path.exists(merged_video_path):
+            if merged_video_path:
                 st.success("✅ Video processing complete!")
                 
-                # Provide download button
-                with open(merged_video_path, "rb") as file:
-                    video_bytes = file.read()
-                
+                # Provide download button; the file is only read when clicked
                 st.download_button(
                     label="📥 Download Processed Video",
-                    data=video_bytes,
+                    data=Path(merged_video_path).read_bytes,
                     file_name=f"renderrush_parallel_{filter_type}_{timestamp}.mp4",
                     mime="video/mp4",
                     type="primary"
                 )
                 
                 # Show processing info
-                file_size_mb = len(video_bytes) / (1024 * 1024)
+                file_size_mb = os.path.getsize(merged_video_path) / (1024 * 1024)
                 st.info(f"📁 File size: {file_size_mb:.1f}MB | Filter: {filter_type} | Workers: {workers} | Time: {processing_time:.1f}s")
                 
                 # Record results
@@ -520,10 +591,8 @@ def run_parallel_processing(video_path: str, filter_type: str, workers: int, seg
         except Exception as merge_error:
             st.error(f"❌ Failed to merge video segments: {merge_error}")
         
-        # Cleanup
-        video_processor.cleanup_temp_files(segments)
-        if os.path.exists(video_path):
-            os.remove(video_path)
+        # Cleanup runs in the background so results show without waiting on unlinks
+        video_processor.cleanup_temp_files_async(segments + [video_path])
             
     except Exception as e:
         st.error(f"Processing failed: {e}")
@@ -542,7 +611,6 @@ def run_demo_mode(video_path: str, filter_type: str, workers: int):
         # For demo, process the video directly without segmentation
         timestamp = int(time.time())
         output_path = f"output/demo_processed_{timestamp}.mp4"
-        os.makedirs("output", exist_ok=True)
         
         # Apply filter directly to the video
         start_time = time.time()
@@ -552,28 +620,24 @@ def run_demo_mode(video_path: str, filter_type: str, workers: int):
         if result and os.path.exists(output_path):
             st.success(f"✅ Demo processing completed in {processing_time:.1f}s")
             
-            # Provide download button
-            with open(output_path, "rb") as file:
-                video_bytes = file.read()
-            
+            # Provide download button; the file is only read when clicked
             st.download_button(
                 label="📥 Download Demo Video",
-                data=video_bytes,
+                data=Path(output_path).read_bytes,
                 file_name=f"renderrush_demo_{filter_type}_{timestamp}.mp4",
                 mime="video/mp4",
                 type="primary"
             )
             
             # Show info
-            file_size_mb = len(video_bytes) / (1024 * 1024)
+            file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
             st.info(f"📁 File size: {file_size_mb:.1f}MB | Filter: {filter_type} | Processing time: {processing_time:.1f}s")
             
         else:
             st.error("❌ Demo processing failed")
         
-        # Cleanup
-        if os.path.exists(video_path):
-            os.remove(video_path)
+        # Cleanup runs in the background so results show without waiting on unlinks
+        video_processor.cleanup_temp_files_async([video_path])
             
     except Exception as e:
         st.error(f"Demo processing failed: {e}")
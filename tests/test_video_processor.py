@@ -7,23 +7,29 @@ import numpy as np
 import cv2
 import os
 import tempfile
-from src.video_processor import VideoProcessor
+from src.video_processor import VideoProcessor, SegmentMerger
 
 
 class TestVideoProcessor(unittest.TestCase):
     """Test cases for VideoProcessor"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Encode the shared test video once; tests only read it"""
+        cls.test_video_path = cls._create_test_video()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the shared test video"""
+        if os.path.exists(cls.test_video_path):
+            os.remove(cls.test_video_path)
+    
     def setUp(self):
         """Set up test fixtures"""
         self.processor = VideoProcessor(segment_duration=5.0)
-        self.test_video_path = self._create_test_video()
     
-    def tearDown(self):
-        """Clean up test fixtures"""
-        if os.path.exists(self.test_video_path):
-            os.remove(self.test_video_path)
-    
-    def _create_test_video(self):
+    @staticmethod
+    def _create_test_video():
         """Create a simple test video"""
         # Create temporary video file
         temp_file = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
@@ -34,11 +40,12 @@ class TestVideoProcessor(unittest.TestCase):
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
         out = cv2.VideoWriter(temp_path, fourcc, 30.0, (640, 480))
         
-        # Write 150 frames (5 seconds at 30 FPS)
-        for i in range(150):
-            # Create a simple colored frame
-            frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            frame[:, :] = [i % 255, (i * 2) % 255, (i * 3) % 255]
+        # Write 150 frames (5 seconds at 30 FPS) of simple solid colors
+        steps = np.arange(150)
+        colors = (np.stack([steps, steps * 2, steps * 3], axis=1) % 255).astype(np.uint8)
+        frame = np.empty((480, 640, 3), dtype=np.uint8)
+        for color in colors:
+            frame[:] = color
             out.write(frame)
         
         out.release()
@@ -64,6 +71,64 @@ class TestVideoProcessor(unittest.TestCase):
         # Check that segment files exist
         for segment in segments:
             self.assertTrue(os.path.exists(segment))
+        self.processor.cleanup_temp_files(segments)
+    
+    def test_merge_segments(self):
+        """Test merging segments returns the output path"""
+        segments, _ = self.processor.split_video(self.test_video_path)
+        output_path = os.path.join(self.processor.output_dir, "test_merged.mp4")
+        
+        result = self.processor.merge_segments(segments, output_path)
+        
+        self.assertEqual(result, output_path)
+        self.assertTrue(os.path.exists(output_path))
+        self.processor.cleanup_temp_files(segments + [output_path])
+    
+    def test_merge_segments_unwritable_output(self):
+        """Test merging into an unwritable location returns None"""
+        segments, _ = self.processor.split_video(self.test_video_path)
+        output_path = os.path.join("missing_dir", "nested", "merged.mp4")
+        
+        self.assertIsNone(self.processor.merge_segments(segments, output_path))
+        self.processor.cleanup_temp_files(segments)
+    
+    def test_segment_merger_out_of_order(self):
+        """Test segments added out of order are merged in order"""
+        processor = VideoProcessor(segment_duration=1.0)
+        segments, _ = processor.split_video(self.test_video_path)
+        self.assertGreater(len(segments), 1)
+        output_path = os.path.join(processor.output_dir, "test_incremental.mp4")
+        merger = SegmentMerger(processor, output_path)
+        
+        for index in reversed(range(len(segments))):
+            merger.add(index, segments[index])
+        
+        self.assertEqual(merger.close(), output_path)
+        self.assertEqual(processor.get_video_info(output_path)['frame_count'], 150)
+        
+        # Frame i was drawn with blue level i; lossy encoding shifts single
+        # frames, but each 1 s segment must be about 30 levels above the last
+        cap = cv2.VideoCapture(output_path)
+        blue = []
+        ok, frame = cap.read()
+        while ok:
+            blue.append(frame[..., 0].mean())
+            ok, frame = cap.read()
+        cap.release()
+        segment_means = np.reshape(blue, (len(segments), -1)).mean(axis=1)
+        self.assertTrue(np.all(np.diff(segment_means) > 15))
+        processor.cleanup_temp_files(segments + [output_path])
+    
+    def test_process_segment_brightness(self):
+        """Test batched brightness processing keeps every frame"""
+        output_path = os.path.join(self.processor.output_dir, "test_brightness.mp4")
+        
+        result = self.processor.process_segment((0, self.test_video_path, output_path, "brightness"))
+        
+        self.assertEqual(result, output_path)
+        info = self.processor.get_video_info(output_path)
+        self.assertEqual(info['frame_count'], 150)
+        self.processor.cleanup_temp_files([output_path])
     
     def test_apply_filter_grayscale(self):
         """Test grayscale filter application"""